@@ -0,0 +1,110 @@
+"""Benchmark: concurrent reads through the sync vs async routers
+
+Serves the same read endpoints from two in-process apps, one with the sync
+routers (threadpool + psycopg2) and one with the async routers (asyncpg),
+and fires `--concurrency` requests at a time through httpx's ASGI
+transport. Reports throughput and latency percentiles; no HTTP server or
+network is involved, so the numbers isolate the handler and database
+layers. Needs httpx and a seeded database (any allocation-service data).
+With the default pool, sync handlers queue for threadpool slots and pooled
+connections well below the default concurrency, so high-concurrency runs
+of the sync app can stall; use --apps async to measure the async app alone,
+or raise DB_POOL_SIZE / DB_MAX_OVERFLOW (see db_pool.py). The pool status
+of each engine is printed after the runs.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_async_reads [--requests 5000] [--concurrency 1000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import FastAPI
+from database import SessionLocal, async_engine, engine
+from db_pool import pool_status
+from models import Allocation, Resource
+from routers import allocations, allocations_async, resources, resources_async
+
+
+def build_app(routers) -> FastAPI:
+    app = FastAPI()
+    for module in routers:
+        app.include_router(module.router)
+    return app
+
+
+async def run(app: FastAPI, paths: list[str], total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    # Handler exceptions (e.g. pool timeouts) count as errors instead of aborting
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--apps", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    resource_ids = [r for (r,) in db.query(Resource.resource_id).limit(100)]
+    allocation_ids = [a for (a,) in db.query(Allocation.allocation_id).limit(100)]
+    db.close()
+    if not resource_ids:
+        raise SystemExit("No resources found; seed the database first")
+
+    paths = [f"/resources/{resource_id}" for resource_id in resource_ids] + [
+        f"/allocations/{allocation_id}" for allocation_id in allocation_ids
+    ]
+    apps = {
+        "sync": build_app([resources, allocations]),
+        "async": build_app([resources_async, allocations_async]),
+    }
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    for name in args.apps:
+        app = apps[name]
+        result = asyncio.run(run(app, paths, args.requests, args.concurrency))
+        print(
+            f"  {name:<6}: {result['rps']:8.0f} req/s  p50={result['p50']:7.1f}ms  "
+            f"p99={result['p99']:7.1f}ms  errors={result['errors']}"
+        )
+
+    for name, bind in (("sync", engine), ("async", async_engine and async_engine.sync_engine)):
+        if bind is not None:
+            status = pool_status(bind)
+            print(
+                f"  {name} pool: size={status.get('size')} "
+                f"checkouts={status.get('checkouts')} timeouts={status.get('timeouts')} "
+                f"wait avg={status.get('wait_avg_ms')}ms max={status.get('wait_max_ms')}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
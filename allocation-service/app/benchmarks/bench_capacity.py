@@ -0,0 +1,96 @@
+"""Benchmark: linear resource scan vs per-city capacity heaps
+
+Replays the same request stream through both selectors on a reference
+dataset and fails if any pick differs.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_capacity [--requests 10000] [--resources 500]
+"""
+import argparse
+import random
+import time
+from models import Resource
+from services.capacity import CapacityTracker, SAME_CITY_BONUS
+
+CITIES = [f"City-{i:02d}" for i in range(40)]
+
+
+def linear_best(resources, active_counts, city):
+    """Pre-heap selection: score every resource on every request"""
+    best_resource = None
+    best_score = -1
+    for resource in resources:
+        free = resource.capacity - active_counts[resource.resource_id]
+        if free <= 0:
+            continue
+        resource_score = free
+        if city and resource.city == city:
+            resource_score += SAME_CITY_BONUS
+        if resource_score > best_score:
+            best_score = resource_score
+            best_resource = resource
+    return best_resource
+
+
+def make_resources(count: int) -> list[Resource]:
+    return [
+        Resource(
+            resource_id=f"RES-{i}",
+            resource_type="TECH_TEAM",
+            capacity=random.randint(1, 30),
+            city=random.choice(CITIES),
+            status="AVAILABLE",
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--resources", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    resources = make_resources(args.resources)
+    initial_counts = {
+        r.resource_id: random.randint(0, r.capacity) for r in resources
+    }
+    # Include requesters without a city and from cities with no resources
+    request_cities = [
+        random.choice(CITIES + [None, "Nowhere"]) for _ in range(args.requests)
+    ]
+
+    start = time.perf_counter()
+    counts = dict(initial_counts)
+    linear_picks = []
+    for city in request_cities:
+        resource = linear_best(resources, counts, city)
+        linear_picks.append(resource.resource_id if resource else None)
+        if resource:
+            counts[resource.resource_id] += 1
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tracker = CapacityTracker(resources, initial_counts)
+    heap_picks = []
+    for city in request_cities:
+        resource, _ = tracker.best_for(city)
+        heap_picks.append(resource.resource_id if resource else None)
+        if resource:
+            tracker.assign(resource.resource_id)
+    heap_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(linear_picks, heap_picks) if a != b)
+    assert mismatches == 0, f"{mismatches} picks differ from the linear scan"
+
+    assigned = sum(1 for pick in heap_picks if pick)
+    print(f"requests={args.requests} resources={args.resources} assigned={assigned}")
+    print(f"linear : {linear_time:8.3f}s")
+    print(f"heap   : {heap_time:8.3f}s")
+    print(f"speedup: {linear_time / heap_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
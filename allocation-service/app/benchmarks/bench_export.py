@@ -0,0 +1,76 @@
+"""Benchmark: streaming export vs building the full response list
+
+Exports every request once the way the old list endpoint answered (ORM
+objects -> RequestResponse list -> JSON) and once through the streaming
+NDJSON export, and reports rows/s and peak Python heap (tracemalloc, which
+slows both runs) for each. The streamed peak should stay near one batch
+(EXPORT_BATCH_SIZE) regardless of table size. Works on the current
+database; seed a large requests table for meaningful numbers.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_export [--format ndjson|csv]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from database import SessionLocal
+from models import Request
+from schemas import RequestResponse
+from services.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, export_statement, stream_rows
+
+
+def full_list() -> int:
+    db = SessionLocal()
+    try:
+        rows = db.query(Request).order_by(Request.created_at, Request.request_id).all()
+        body = json.dumps(
+            [RequestResponse.model_validate(row).model_dump(mode="json") for row in rows]
+        )
+        return len(body)
+    finally:
+        db.close()
+
+
+def streamed(fmt: str) -> int:
+    statement = export_statement(Request, RequestResponse).order_by(
+        Request.created_at, Request.request_id
+    )
+    chunks = stream_rows(statement, list(RequestResponse.model_fields), fmt)
+    return sum(len(chunk) for chunk in chunks)
+
+
+def measure(fn) -> tuple[int, float, int]:
+    """(bytes produced, seconds, peak traced bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    total = db.query(Request).count()
+    db.close()
+    print(f"requests={total} batch={EXPORT_BATCH_SIZE}")
+
+    for name, fn in (
+        ("full list", full_list),
+        (f"stream {args.format}", lambda: streamed(args.format)),
+    ):
+        size, elapsed, peak = measure(fn)
+        print(
+            f"  {name:<13}: {total / elapsed:10,.0f} rows/s  "
+            f"{size / 1024 / 1024:7.1f} MiB out  peak heap {peak / 1024 / 1024:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: legacy six-hex-digit IDs vs ULID vs sequence-block IDs
+
+Reports generation rate and duplicates per scheme. On PostgreSQL it also
+inserts every scheme's IDs into a scratch table with a string primary key,
+reporting insert throughput and final primary key index size. Random keys
+split B-tree pages all over the index; time-ordered keys append to the
+right-most page.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_ids [--ids 1000000] [--rows 200000]
+"""
+import argparse
+import time
+import uuid
+from sqlalchemy import text
+from database import engine
+from services.ids import SequenceBlockGenerator, UlidGenerator
+
+
+def legacy_ids(count: int) -> list[str]:
+    return [f"AL-{uuid.uuid4().hex[:6].upper()}" for _ in range(count)]
+
+
+def schemes() -> dict:
+    ulid = UlidGenerator()
+    result = {
+        "legacy hex6": legacy_ids,
+        "ulid (single)": lambda count: [ulid.new_id("AL") for _ in range(count)],
+        "ulid (batch)": lambda count: ulid.new_ids("AL", count),
+    }
+    if engine.dialect.name == "postgresql":
+        sequence = SequenceBlockGenerator()
+        result["sequence (single)"] = lambda count: [
+            sequence.new_id("AL") for _ in range(count)
+        ]
+        result["sequence (batch)"] = lambda count: sequence.new_ids("AL", count)
+    return result
+
+
+def insert_throughput(ids: list[str], chunk_size: int = 1000) -> tuple[int, float, int]:
+    """(rows inserted, seconds, primary key index bytes) for a fresh table"""
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS bench_ids"))
+        connection.execute(
+            text("CREATE TABLE bench_ids (id VARCHAR PRIMARY KEY, payload INTEGER)")
+        )
+
+    statement = text(
+        "INSERT INTO bench_ids (id, payload) VALUES (:id, :payload) "
+        "ON CONFLICT (id) DO NOTHING"
+    )
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for offset in range(0, len(ids), chunk_size):
+            connection.execute(
+                statement,
+                [{"id": value, "payload": offset} for value in ids[offset : offset + chunk_size]],
+            )
+    elapsed = time.perf_counter() - start
+
+    with engine.begin() as connection:
+        inserted = connection.execute(text("SELECT count(*) FROM bench_ids")).scalar()
+        index_bytes = connection.execute(
+            text("SELECT pg_relation_size('bench_ids_pkey')")
+        ).scalar()
+        connection.execute(text("DROP TABLE bench_ids"))
+    return inserted, elapsed, index_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ids", type=int, default=1_000_000, help="IDs per generation run")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per insert run")
+    args = parser.parse_args()
+
+    print(f"generation: {args.ids} ids per scheme")
+    for name, generate in schemes().items():
+        start = time.perf_counter()
+        ids = generate(args.ids)
+        elapsed = time.perf_counter() - start
+        duplicates = len(ids) - len(set(ids))
+        print(
+            f"  {name:<18}: {args.ids / elapsed:12,.0f} ids/s  "
+            f"duplicates={duplicates}  ordered={ids == sorted(ids)}"
+        )
+
+    if engine.dialect.name != "postgresql":
+        print("insert throughput: skipped (needs PostgreSQL DATABASE_URL)")
+        return
+
+    print(f"insert throughput: {args.rows} rows per scheme")
+    for name, generate in schemes().items():
+        if "single" in name:
+            continue
+        inserted, elapsed, index_bytes = insert_throughput(generate(args.rows))
+        print(
+            f"  {name:<18}: {inserted / elapsed:12,.0f} rows/s  "
+            f"inserted={inserted}  pkey={index_bytes / 1024 / 1024:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
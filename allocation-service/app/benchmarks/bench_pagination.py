@@ -0,0 +1,76 @@
+"""Benchmark: keyset pages vs OFFSET pages vs the unpaginated request list
+
+Times fetching one page of GET /requests' query at increasing depths,
+once with LIMIT/OFFSET and once with the keyset cursor of the same page,
+plus a single unpaginated `.all()` as the endpoint used to run it. OFFSET
+cost grows with depth (every skipped row is read); keyset pages stay flat.
+Works on the current database; seed a large requests table for
+meaningful numbers.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_pagination [--limit 100] [--repeat 5]
+"""
+import argparse
+import time
+from database import SessionLocal
+from models import Request
+from services.pagination import encode_cursor, paginate
+
+ORDER = (Request.created_at.desc(), Request.request_id.desc())
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = db.query(Request).count()
+        if total <= args.limit:
+            raise SystemExit("Not enough requests; seed the database first")
+
+        full = best_of(args.repeat, lambda: db.query(Request).order_by(*ORDER).all())
+        db.expunge_all()
+        print(f"requests={total} limit={args.limit}")
+        print(f"  unpaginated .all(): {full:9.2f}ms")
+
+        for fraction in (0.0, 0.25, 0.5, 0.75, 0.99):
+            offset = int((total - args.limit) * fraction)
+            if offset:
+                # Cursor of the row just before the page
+                last = db.query(Request).order_by(*ORDER).offset(offset - 1).first()
+                cursor = encode_cursor(last.created_at, last.request_id)
+            else:
+                cursor = None
+
+            offset_ms = best_of(
+                args.repeat,
+                lambda: db.query(Request).order_by(*ORDER).offset(offset).limit(args.limit).all(),
+            )
+            keyset_ms = best_of(
+                args.repeat,
+                lambda: paginate(
+                    db.query(Request), Request.created_at, Request.request_id, args.limit, cursor
+                ).all(),
+            )
+            db.expunge_all()
+            print(
+                f"  depth {offset:>9}: offset {offset_ms:8.2f}ms   keyset {keyset_ms:8.2f}ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: legacy per-request condition parsing vs compiled rule set
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_rule_engine [--requests 100000] [--rules 60 500]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from models import AllocationRule, Request
+from services.rule_engine import compile_rules, RULE_ATTRIBUTES
+
+URGENCIES = ["HIGH", "MEDIUM", "LOW"]
+SERVICES = ["SUPERONLINE", "PAYCELL", "TVPLUS"]
+REQUEST_TYPES = [f"TYPE_{i:03d}" for i in range(40)]
+
+
+def legacy_score(request, rules) -> float:
+    """Pre-compilation scoring loop: re-parses every condition per request"""
+    score = 0.0
+    for rule in rules:
+        if not rule.is_active:
+            continue
+        condition = rule.condition
+        for attribute, column in RULE_ATTRIBUTES.items():
+            if f"{attribute} ==" in condition:
+                value = condition.split("==")[1].strip().strip("'\"")
+                if getattr(request, column) == value:
+                    score += rule.weight
+                break
+    return score
+
+
+def make_rules(count: int) -> list[AllocationRule]:
+    pools = [("urgency", URGENCIES), ("service", SERVICES), ("request_type", REQUEST_TYPES)]
+    rules = []
+    for i in range(count):
+        attribute, values = pools[i % len(pools)]
+        rules.append(
+            AllocationRule(
+                rule_id=f"RULE-{i:03d}",
+                condition=f"{attribute} == '{random.choice(values)}'",
+                weight=random.randint(1, 50),
+                is_active=True,
+            )
+        )
+    return rules
+
+
+def make_requests(count: int) -> list[Request]:
+    now = datetime.utcnow()
+    return [
+        Request(
+            request_id=f"REQ-{i}",
+            user_id="U1",
+            service_id=random.choice(SERVICES),
+            request_type_id=random.choice(REQUEST_TYPES),
+            urgency=random.choice(URGENCIES),
+            created_at=now - timedelta(minutes=random.randint(0, 1440)),
+            status="PENDING",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, nargs="+", default=[60, 500])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    pending = make_requests(args.requests)
+
+    for rule_count in args.rules:
+        rules = make_rules(rule_count)
+
+        legacy, legacy_time = timed(lambda: [legacy_score(r, rules) for r in pending])
+
+        def compiled_run():
+            rule_set = compile_rules(rules)
+            return [rule_set.base_score(r) for r in pending]
+
+        compiled, compiled_time = timed(compiled_run)
+
+        assert legacy == compiled, "compiled scores differ from legacy scores"
+
+        print(f"requests={args.requests} rules={rule_count}")
+        print(f"  legacy   : {legacy_time:8.3f}s")
+        print(f"  compiled : {compiled_time:8.3f}s")
+        print(f"  speedup  : {legacy_time / compiled_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark: single-process batch allocation vs city-sharded worker pool
+
+Seeds a large multi-city backlog into a scratch PostgreSQL database, then
+drains it once with a plain greedy batch and once per worker count with
+sharded allocation, reseeding in between. Reports wall time, speedup over
+the plain batch and the same-city share of the result. Scaling is bounded
+by the number of cores and by the largest city's share of the backlog.
+The ALLOCATION_SHARD_MIN_REQUESTS gate is bypassed, but workers are still
+capped at the core count, so run it on the target hardware.
+
+DESTRUCTIVE: every table of the target database is emptied.
+
+Usage (from the service root, e.g. /app inside the container):
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_sharded \\
+        [--cities 16] [--requests 100000] [--resources 1600] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from database import Base, engine, SessionLocal
+from models import AllocationRule, Request, RequestType, Resource, Service, User
+from services.allocation import AllocationService
+from services.sharded import allocate_sharded, effective_workers, shard_pool
+
+URGENCIES = ["HIGH", "MEDIUM", "LOW"]
+USERS_PER_CITY = 50
+
+
+def seed(cities: list[str], requests: int, resources: int, seed_value: int):
+    random.seed(seed_value)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        connection.execute(text(f"TRUNCATE {tables} CASCADE"))
+        connection.execute(insert(Service), [{"service_id": "SUPERONLINE", "name": "S"}])
+        connection.execute(
+            insert(RequestType),
+            [{"type_id": "INSTALL", "service_id": "SUPERONLINE", "name": "Kurulum"}],
+        )
+        connection.execute(
+            insert(AllocationRule),
+            [
+                {"rule_id": f"RULE-{u}", "condition": f"urgency == '{u}'", "weight": w, "is_active": True}
+                for u, w in zip(URGENCIES, (50, 25, 5))
+            ],
+        )
+        connection.execute(
+            insert(User),
+            [
+                {"user_id": f"U-{c}-{i}", "name": "u", "city": city, "service_id": "SUPERONLINE"}
+                for c, city in enumerate(cities)
+                for i in range(USERS_PER_CITY)
+            ],
+        )
+        connection.execute(
+            insert(Resource),
+            [
+                {
+                    "resource_id": f"RES-{i}",
+                    "resource_type": "TECH_TEAM",
+                    "capacity": random.randint(5, 40),
+                    "city": cities[i % len(cities)],
+                    "status": "AVAILABLE",
+                    "active_count": 0,
+                }
+                for i in range(resources)
+            ],
+        )
+        rows = [
+            {
+                "request_id": f"REQ-{i}",
+                "user_id": f"U-{random.randrange(len(cities))}-{random.randrange(USERS_PER_CITY)}",
+                "service_id": "SUPERONLINE",
+                "request_type_id": "INSTALL",
+                "urgency": random.choice(URGENCIES),
+                "created_at": now - timedelta(minutes=random.randint(0, 1440)),
+                "status": "PENDING",
+            }
+            for i in range(requests)
+        ]
+        for offset in range(0, len(rows), 10_000):
+            connection.execute(insert(Request), rows[offset : offset + 10_000])
+
+
+def same_city_share() -> float:
+    with engine.connect() as connection:
+        matched, total = connection.execute(
+            text(
+                "SELECT count(*) FILTER (WHERE u.city = r.city), count(*) "
+                "FROM allocations a JOIN resources r ON r.resource_id = a.resource_id "
+                "JOIN requests q ON q.request_id = a.request_id "
+                "JOIN users u ON u.user_id = q.user_id"
+            )
+        ).one()
+    return matched / total if total else 0.0
+
+
+def timed_run(fn) -> tuple[int, float]:
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        allocated = len(fn(db))
+        return allocated, time.perf_counter() - start
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--resources", type=int, default=1600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs PostgreSQL; set DATABASE_URL")
+
+    cities = [f"City-{i:02d}" for i in range(args.cities)]
+    print(
+        f"requests={args.requests} resources={args.resources} cities={args.cities} "
+        f"cores={os.cpu_count()}"
+    )
+
+    seed(cities, args.requests, args.resources, args.seed)
+    allocated, baseline = timed_run(
+        lambda db: AllocationService.allocate_pending_requests(db, "greedy")
+    )
+    print(
+        f"  batch       : {baseline:8.3f}s  {allocated} allocated, "
+        f"same-city {same_city_share():.1%}"
+    )
+
+    for requested in args.workers:
+        workers = effective_workers(requested, args.requests, args.cities, 0)
+        if workers > 1:
+            # Start the pool outside the timed run (spawned interpreters)
+            pool = shard_pool(workers)
+            list(pool.map(abs, range(workers)))
+        seed(cities, args.requests, args.resources, args.seed)
+        allocated, elapsed = timed_run(
+            lambda db: allocate_sharded(db, "greedy", workers, min_requests=0)
+        )
+        print(
+            f"  sharded x{workers:<3}: {elapsed:8.3f}s  {allocated} allocated, "
+            f"same-city {same_city_share():.1%}, speedup {baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: per-request calculate_priority vs NumPy columnar scoring
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.bench_vectorized [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from models import AllocationRule
+from services.allocation import AllocationService
+from services.rule_engine import compile_rules
+from services.vectorized import score_columns, to_datetime64
+
+URGENCIES = ["HIGH", "MEDIUM", "LOW"]
+SERVICES = ["SUPERONLINE", "PAYCELL", "TVPLUS"]
+REQUEST_TYPES = [f"TYPE_{i:03d}" for i in range(40)]
+
+
+class Row:
+    """Lightweight stand-in for a Request ORM object"""
+
+    __slots__ = ("request_id", "urgency", "service_id", "request_type_id", "created_at")
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+
+def make_rules(count: int) -> list[AllocationRule]:
+    pools = [("urgency", URGENCIES), ("service", SERVICES), ("request_type", REQUEST_TYPES)]
+    return [
+        AllocationRule(
+            rule_id=f"RULE-{i:03d}",
+            condition=f"{pools[i % 3][0]} == '{random.choice(pools[i % 3][1])}'",
+            weight=random.randint(1, 50),
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+
+
+def make_columns(size: int, as_of: datetime) -> dict[str, list]:
+    return {
+        "request_id": [f"REQ-{i}" for i in range(size)],
+        "urgency": random.choices(URGENCIES, k=size),
+        "service_id": random.choices(SERVICES, k=size),
+        "request_type_id": random.choices(REQUEST_TYPES, k=size),
+        "created_at": [
+            as_of - timedelta(microseconds=random.randint(0, 48 * 3600 * 10**6))
+            for _ in range(size)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--rules", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rule_set = compile_rules(make_rules(args.rules))
+    as_of = datetime.utcnow()
+
+    for size in args.sizes:
+        columns = make_columns(size, as_of)
+        rows = [
+            Row(*values)
+            for values in zip(
+                columns["request_id"],
+                columns["urgency"],
+                columns["service_id"],
+                columns["request_type_id"],
+                columns["created_at"],
+            )
+        ]
+
+        start = time.perf_counter()
+        expected = [
+            AllocationService.calculate_priority(row, rule_set, None, as_of)
+            for row in rows
+        ]
+        loop_time = time.perf_counter() - start
+
+        # load_pending_columns returns created_at as datetime64[us]
+        columns["created_at"] = to_datetime64(columns["created_at"])
+        start = time.perf_counter()
+        actual = score_columns(rule_set, columns, as_of)
+        numpy_time = time.perf_counter() - start
+
+        assert np.array_equal(actual, np.array(expected)), "columnar scores differ"
+
+        print(
+            f"rows={size:>9}: loop={loop_time:8.3f}s numpy={numpy_time:8.3f}s "
+            f"speedup={loop_time / numpy_time:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Query-plan regression check for the hot filter queries
+
+Runs EXPLAIN on each hot query with sequential scans discouraged
+(enable_seqscan = off). If the planner still picks a Seq Scan on the
+queried table, no index can serve that query shape and the check fails
+with exit code 1. Requires PostgreSQL (DATABASE_URL) with migrations
+applied.
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.check_query_plans
+"""
+import json
+import sys
+from datetime import datetime
+from sqlalchemy import func, select, text, tuple_
+from database import engine
+from models import Allocation, Notification, Request, Resource
+
+HOT_QUERIES = {
+    "pending requests by age": (
+        "requests",
+        select(Request.request_id)
+        .where(Request.status == "PENDING")
+        .order_by(Request.created_at.desc()),
+    ),
+    "request list page": (
+        "requests",
+        select(Request.request_id)
+        .where(
+            tuple_(Request.created_at, Request.request_id)
+            < tuple_(datetime(2026, 1, 1), "REQ-1")
+        )
+        .order_by(Request.created_at.desc(), Request.request_id.desc())
+        .limit(101),
+    ),
+    "assigned allocations per resource": (
+        "allocations",
+        select(Allocation.resource_id, func.count(Allocation.allocation_id))
+        .where(Allocation.status == "ASSIGNED")
+        .group_by(Allocation.resource_id),
+    ),
+    "resource capacity check": (
+        "allocations",
+        select(func.count(Allocation.allocation_id)).where(
+            Allocation.resource_id == "RES-1", Allocation.status == "ASSIGNED"
+        ),
+    ),
+    "allocations by status": (
+        "allocations",
+        select(Allocation.allocation_id)
+        .where(Allocation.status == "ASSIGNED")
+        .order_by(Allocation.timestamp.desc()),
+    ),
+    "allocation list page": (
+        "allocations",
+        select(Allocation.allocation_id)
+        .where(
+            tuple_(Allocation.timestamp, Allocation.allocation_id)
+            < tuple_(datetime(2026, 1, 1), "AL-1")
+        )
+        .order_by(Allocation.timestamp.desc(), Allocation.allocation_id.desc())
+        .limit(101),
+    ),
+    "allocation of a request": (
+        "allocations",
+        select(Allocation.allocation_id).where(Allocation.request_id == "REQ-1"),
+    ),
+    "available resources": (
+        "resources",
+        select(Resource.resource_id).where(Resource.status == "AVAILABLE"),
+    ),
+    "user notifications": (
+        "notifications",
+        select(Notification.notification_id)
+        .where(Notification.user_id == "U1")
+        .order_by(Notification.created_at.desc()),
+    ),
+}
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def sequential_scans(connection, query) -> list[str]:
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        node.get("Relation Name")
+        for node in plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan"
+    ]
+
+
+def main() -> int:
+    failures = []
+    with engine.connect() as connection:
+        with connection.begin():
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for name, (table, query) in HOT_QUERIES.items():
+                scanned = sequential_scans(connection, query)
+                ok = table not in scanned
+                print(f"{'ok  ' if ok else 'FAIL'} {name}")
+                if not ok:
+                    failures.append(name)
+
+    if failures:
+        print(f"{len(failures)} hot queries fall back to a sequential scan")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Consistency check for the incrementally maintained request rollups
+
+Rebuilds the (status, urgency, service_id) counts from the requests table
+and diffs them against request_rollups. Exits 1 when any group differs;
+--repair applies the corrections (as the periodic reconciliation does).
+
+Usage (from the service root, e.g. /app inside the container):
+    python -m benchmarks.check_request_rollups [--repair]
+"""
+import argparse
+import sys
+from database import SessionLocal
+from services.request_rollups import reconcile_request_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="fix the drift found")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = reconcile_request_rollups(db, repair=args.repair)
+    finally:
+        db.close()
+
+    for (status, urgency, service_id), (stored, actual) in sorted(drift.items()):
+        print(f"DIFF {status}/{urgency}/{service_id}: stored={stored} actual={actual}")
+    if not drift:
+        print("ok   request rollups match the requests table")
+        return 0
+    print(f"{len(drift)} rollup groups {'repaired' if args.repair else 'differ'}")
+    return 0 if args.repair else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""Stress test: concurrent allocation workers against one PostgreSQL database
+
+Seeds a fresh data set, then runs several worker processes that drain the
+backlog at the same time with batch allocations (half of them through the
+in-memory pending queue), single-request allocations and releases. With
+--all-queued, worker 0 only creates the new requests, like an API
+replica. The other workers drain only their own queues and allocate only
+in batches, so requests a queue misses stay pending. While
+they run, the workers also create `--new-requests` requests like POST
+/requests does. Each worker pushes only into its own process's queue, as
+separate replicas would. Once all workers are done it checks that nothing
+was overbooked:
+
+- every request has at most one allocation
+- no resource holds more ASSIGNED allocations than its capacity
+- Resource.active_count matches the ASSIGNED allocations
+- request rollups match the requests table
+- request and allocation statuses agree
+- the backlog was drained (no pending request left, or no free capacity)
+- no worker operation raised (deadlocks, integrity errors, ...)
+
+Exits with code 1 when any check fails. DESTRUCTIVE: every table of the
+target database is emptied first, so point DATABASE_URL at a scratch
+database.
+
+Usage (from the service root, e.g. /app inside the container):
+    DATABASE_URL=postgresql://... python -m benchmarks.stress_allocation_locks \\
+        [--workers 6] [--requests 3000] [--new-requests 600] [--resources 60]
+        [--limit 150] [--all-queued] [--timeout 300]
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+CITIES = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya"]
+URGENCIES = ["HIGH", "MEDIUM", "LOW"]
+
+
+def seed(requests: int, resources: int, seed_value: int):
+    from sqlalchemy import text
+    from database import Base, engine, SessionLocal
+    from services.request_rollups import reconcile_request_rollups
+    from models import (
+        AllocationRule,
+        Request,
+        RequestType,
+        Resource,
+        Service,
+        User,
+    )
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This stress test needs PostgreSQL (row locks); set DATABASE_URL")
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        connection.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+    random.seed(seed_value)
+    db = SessionLocal()
+    db.add(Service(service_id="SUPERONLINE", name="Superonline"))
+    db.add(RequestType(type_id="INSTALL", service_id="SUPERONLINE", name="Kurulum"))
+    for i in range(200):
+        db.add(
+            User(
+                user_id=f"U{i}",
+                name=f"User {i}",
+                city=random.choice(CITIES),
+                service_id="SUPERONLINE",
+            )
+        )
+    db.flush()
+    for i, (condition, weight) in enumerate(
+        [("urgency == 'HIGH'", 50), ("urgency == 'MEDIUM'", 25), ("urgency == 'LOW'", 5)]
+    ):
+        db.add(AllocationRule(rule_id=f"RULE-{i}", condition=condition, weight=weight))
+    for i in range(resources):
+        db.add(
+            Resource(
+                resource_id=f"RES-{i}",
+                resource_type="TECH_TEAM",
+                capacity=random.randint(5, 40),
+                city=random.choice(CITIES),
+                status="AVAILABLE",
+            )
+        )
+    now = datetime.utcnow()
+    db.add_all(
+        Request(
+            request_id=f"REQ-{i}",
+            user_id=f"U{random.randrange(200)}",
+            service_id="SUPERONLINE",
+            request_type_id="INSTALL",
+            urgency=random.choice(URGENCIES),
+            created_at=now - timedelta(minutes=random.randint(0, 1440)),
+            status="PENDING",
+        )
+        for i in range(requests)
+    )
+    db.commit()
+    reconcile_request_rollups(db)  # rollups of the seeded backlog
+    db.close()
+
+
+def remaining_work(db) -> tuple[int, int]:
+    """(pending requests, free capacity) as currently committed"""
+    from sqlalchemy import func
+    from models import Request, Resource
+
+    pending = db.query(func.count(Request.request_id)).filter(
+        Request.status == "PENDING"
+    ).scalar()
+    free = (
+        db.query(
+            func.coalesce(
+                func.sum(func.greatest(Resource.capacity - Resource.active_count, 0)), 0
+            )
+        )
+        .filter(Resource.status == "AVAILABLE")
+        .scalar()
+    )
+    db.rollback()
+    return pending, free
+
+
+def create_request(db, rng):
+    """Create one PENDING request the way POST /requests does"""
+    from models import Request, User
+    from services.ids import new_id
+    from services.pending_queue import pending_queue
+    from services.request_rollups import record_created
+
+    user = db.query(User).filter(User.user_id == f"U{rng.randrange(200)}").one()
+    request = Request(
+        request_id=new_id("REQ"),
+        user_id=user.user_id,
+        service_id="SUPERONLINE",
+        request_type_id="INSTALL",
+        urgency=rng.choice(URGENCIES),
+        created_at=datetime.utcnow(),
+        status="PENDING",
+    )
+    db.add(request)
+    record_created(db, request.urgency, request.service_id)
+    db.commit()
+    db.refresh(request)
+    pending_queue.push(request, user.city)
+
+
+def worker(
+    index: int,
+    strategy: str,
+    limit: int,
+    all_queued: bool,
+    timeout: float,
+    to_create: int,
+    total: int,
+    results,
+    created,
+):
+    from database import SessionLocal
+    from models import Allocation, Request
+    from services.allocation import AllocationService
+    from services.pending_queue import pending_queue
+
+    rng = random.Random(index)
+    db = SessionLocal()
+    if all_queued or index % 2:
+        pending_queue.rebuild(db)
+
+    stats = {"batches": 0, "allocated": 0, "single": 0, "released": 0, "created": 0}
+    errors = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if all_queued and index == 0:
+                # API replica: create every new request, allocate nothing
+                if stats["created"] == to_create:
+                    break
+                create_request(db, rng)
+                stats["created"] += 1
+                created[index] = stats["created"]
+                time.sleep(0.01)
+                continue
+            if stats["created"] < to_create and rng.random() < 0.2:
+                create_request(db, rng)
+                stats["created"] += 1
+                created[index] = stats["created"]
+                continue
+
+            action = rng.random()
+            if action < 0.1 and not all_queued:
+                # Single-request path, locked like POST /allocations/allocate
+                (request_id,) = db.query(Request.request_id).filter(
+                    Request.status == "PENDING"
+                ).order_by(Request.created_at).first() or (None,)
+                request = (
+                    db.query(Request)
+                    .filter(Request.request_id == request_id)
+                    .with_for_update()
+                    .first()
+                )
+                if request and request.status == "PENDING":
+                    if AllocationService.allocate_request(request, db):
+                        stats["single"] += 1
+                else:
+                    db.rollback()
+            elif action < 0.15:
+                # Release path, locked like POST /allocations/{id}/release
+                allocation = (
+                    db.query(Allocation)
+                    .filter(Allocation.status == "ASSIGNED")
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+                if allocation:
+                    AllocationService.release_allocation(allocation, "COMPLETED", db)
+                    stats["released"] += 1
+                else:
+                    db.rollback()
+            else:
+                allocations = AllocationService.allocate_pending_requests(
+                    db, strategy, limit
+                )
+                stats["batches"] += 1
+                stats["allocated"] += len(allocations)
+                if not allocations:
+                    pending, free = remaining_work(db)
+                    # Stop once no more requests can arrive from any worker
+                    if (pending == 0 or free == 0) and sum(created.values()) == total:
+                        break
+                    time.sleep(0.01)  # everything claimable is locked right now
+        except Exception as e:
+            db.rollback()
+            errors.append(f"{type(e).__name__}: {e}".splitlines()[0])
+
+    db.close()
+    stats["errors"] = errors
+    results[index] = stats
+
+
+def check(db) -> list[str]:
+    from sqlalchemy import func
+    from models import Allocation, Request, Resource
+    from services.request_rollups import reconcile_request_rollups
+
+    failures = []
+    doubled = (
+        db.query(Allocation.request_id)
+        .group_by(Allocation.request_id)
+        .having(func.count(Allocation.allocation_id) > 1)
+        .all()
+    )
+    if doubled:
+        failures.append(f"{len(doubled)} requests allocated more than once")
+
+    assigned = dict(
+        db.query(Allocation.resource_id, func.count(Allocation.allocation_id))
+        .filter(Allocation.status == "ASSIGNED")
+        .group_by(Allocation.resource_id)
+        .all()
+    )
+    for resource in db.query(Resource).all():
+        actual = assigned.get(resource.resource_id, 0)
+        if actual > resource.capacity:
+            failures.append(
+                f"{resource.resource_id} overbooked: {actual}/{resource.capacity}"
+            )
+        if resource.active_count != actual:
+            failures.append(
+                f"{resource.resource_id} active_count={resource.active_count}, actual={actual}"
+            )
+
+    mismatched = (
+        db.query(func.count(Request.request_id))
+        .outerjoin(Allocation, Allocation.request_id == Request.request_id)
+        .filter(
+            (Request.status == "ASSIGNED") != (Allocation.status == "ASSIGNED"),
+        )
+        .scalar()
+    )
+    if mismatched:
+        failures.append(f"{mismatched} requests disagree with their allocation status")
+
+    rollup_drift = reconcile_request_rollups(db, repair=False)
+    if rollup_drift:
+        failures.append(f"{len(rollup_drift)} request rollup groups drifted: {rollup_drift}")
+
+    pending, free = remaining_work(db)
+    if pending and free:
+        failures.append(f"backlog not drained: {pending} pending, {free} free slots")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument(
+        "--new-requests", type=int, default=600, help="created while workers run"
+    )
+    parser.add_argument("--resources", type=int, default=60)
+    parser.add_argument("--limit", type=int, default=150, help="requests per batch")
+    parser.add_argument("--strategy", default="greedy")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--all-queued",
+        action="store_true",
+        help="every worker drains its own pending queue, as replicas do",
+    )
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per worker")
+    args = parser.parse_args()
+
+    seed(args.requests, args.resources, args.seed)
+
+    # Fresh interpreters: no engine or connection is shared across a fork
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results = manager.dict()
+        created = manager.dict({i: 0 for i in range(args.workers)})
+        if args.all_queued:
+            shares = [args.new_requests] + [0] * (args.workers - 1)
+        else:
+            shares = [
+                args.new_requests // args.workers + (i < args.new_requests % args.workers)
+                for i in range(args.workers)
+            ]
+        processes = [
+            context.Process(
+                target=worker,
+                args=(
+                    i,
+                    args.strategy,
+                    args.limit,
+                    args.all_queued,
+                    args.timeout,
+                    shares[i],
+                    args.new_requests,
+                    results,
+                    created,
+                ),
+            )
+            for i in range(args.workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        results = dict(results)
+
+    for index in sorted(results):
+        stats = dict(results[index], errors=len(results[index]["errors"]))
+        print(f"worker {index}: {stats}")
+    allocated = sum(r["allocated"] + r["single"] for r in results.values())
+    errors = [error for r in results.values() for error in r["errors"]]
+    print(f"{allocated} allocations by {args.workers} workers in {elapsed:.2f}s")
+
+    from database import SessionLocal
+
+    db = SessionLocal()
+    failures = check(db)
+    db.close()
+    if len(results) < args.workers:
+        failures.append(f"{args.workers - len(results)} workers crashed")
+    if errors:
+        failures.append(f"{len(errors)} worker operations failed, first: {errors[0]}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("ok   no overbooking")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Connection pool settings and checkout metrics.
+
+Pool sizing comes from the environment (defaults match SQLAlchemy's, plus
+pre-ping and a 30 minute recycle):
+
+    DB_POOL_SIZE       persistent connections per engine (5)
+    DB_MAX_OVERFLOW    extra connections opened under load (10)
+    DB_POOL_TIMEOUT    seconds to wait for a free connection (30)
+    DB_POOL_RECYCLE    reconnect connections older than this, -1 = never (1800)
+    DB_POOL_PRE_PING   test connections on checkout, 1/0 (1)
+
+Each engine uses a QueuePool subclass that times every checkout, so the
+pool can be sized from observed wait times, checked-out connections and
+overflow usage (see pool_status).
+"""
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from logging_config import database_logger
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class CheckoutStats:
+    """Checkout wait times of one named pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        milliseconds = seconds * 1000
+        bucket = next(
+            (i for i, bound in enumerate(WAIT_BUCKETS_MS) if milliseconds <= bound),
+            len(WAIT_BUCKETS_MS),
+        )
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.buckets[bucket] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.buckets)),
+            }
+
+
+# Pool logging name -> stats; survives engine.dispose(), which replaces the pool
+CHECKOUT_STATS: dict[str, CheckoutStats] = {}
+_stats_lock = threading.Lock()
+
+
+def checkout_stats(name: str) -> CheckoutStats:
+    with _stats_lock:
+        return CHECKOUT_STATS.setdefault(name, CheckoutStats())
+
+
+class TimedPoolMixin:
+    """Records how long each checkout waited for a connection
+
+    The wait includes opening a new connection when the pool grows into
+    its overflow; pre-ping runs after the checkout and is not included.
+    """
+
+    def _do_get(self):
+        stats = checkout_stats(self.logging_name or "default")
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.observe(time.perf_counter() - start, timed_out=True)
+            database_logger.warning(
+                f"⏳ Pool '{self.logging_name}' checkout timed out: {self.status()}"
+            )
+            raise
+        stats.observe(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, name: str, async_driver: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments for the pool"""
+    if url.startswith("sqlite"):
+        # SQLite keeps SQLAlchemy's default per-thread / static pools
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_driver else TimedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+
+def pool_status(engine) -> dict:
+    """Current occupancy and checkout stats of an engine's pool"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative while the pool has not yet opened pool_size connections
+                "overflow": pool.overflow(),
+                "timeout_s": pool.timeout(),
+            }
+        )
+    if isinstance(pool, TimedPoolMixin):
+        status.update(checkout_stats(pool.logging_name or "default").snapshot())
+    return status
@@ -1,13 +1,19 @@
+import asyncio
 import os
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-<<<<<<< HEAD
-from routers import requests, resources, allocations, rules
-=======
-from routers import requests, resources, allocations, rules, options, services
->>>>>>> dfbe5a019b945a033813f1830a57ca3ebe1b91a1
+from database import engine, async_engine, Base, SessionLocal, DATABASE_ASYNC
+from routers import requests, resources, allocations, rules, services
 from logging_config import api_logger
+from db_pool import pool_status
+from services.pagination import NEXT_CURSOR_HEADER
+from services.pending_queue import pending_queue
+from services.request_rollups import reconcile_request_rollups
+from services.active_counts import (
+    ACTIVE_COUNT_RECONCILE_SECONDS,
+    reconcile_active_counts,
+)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -25,18 +31,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
-app.include_router(requests.router)
-app.include_router(resources.router)
-app.include_router(allocations.router)
-app.include_router(rules.router)
-<<<<<<< HEAD
-=======
-app.include_router(options.router)
-app.include_router(services.router)
->>>>>>> dfbe5a019b945a033813f1830a57ca3ebe1b91a1
+# Async routers unless DATABASE_ASYNC=0 (the sync routers are the fallback)
+if DATABASE_ASYNC:
+    from routers import requests_async, resources_async, allocations_async, rules_async
+
+    api_routers = (requests_async, resources_async, allocations_async, rules_async)
+else:
+    api_routers = (requests, resources, allocations, rules)
+
+for api_router in (*api_routers, services):
+    app.include_router(api_router.router)
 
 
 @app.get("/")
@@ -48,7 +56,58 @@ def read_root():
     }
 
 
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    """Connection pool occupancy and checkout wait times per engine"""
+    metrics = {"sync": pool_status(engine)}
+    if async_engine is not None:
+        metrics["async"] = pool_status(async_engine.sync_engine)
+    return metrics
+
+
+def run_reconciliation():
+    db = SessionLocal()
+    try:
+        reconcile_active_counts(db)
+        reconcile_request_rollups(db)
+        if pending_queue.ready:
+            pending_queue.reconcile(db)
+    finally:
+        db.close()
+
+
+async def reconcile_active_counts_periodically():
+    """Background job repairing counter drift and resyncing the pending queue"""
+    while True:
+        try:
+            await run_in_threadpool(run_reconciliation)
+        except Exception as e:
+            api_logger.error(f"active_count reconciliation failed: {e}", exc_info=True)
+        await asyncio.sleep(ACTIVE_COUNT_RECONCILE_SECONDS)
+
+
 @app.on_event("startup")
 async def startup_event():
     api_logger.info("🚀 Business Logic Service starting...")
+
+    # Rebuild the in-memory pending request queue
+    db = SessionLocal()
+    try:
+        pending_queue.rebuild(db)
+    except Exception as e:
+        api_logger.error(f"Pending queue rebuild failed: {e}", exc_info=True)
+    finally:
+        db.close()
+
+    if ACTIVE_COUNT_RECONCILE_SECONDS > 0:
+        app.state.reconcile_task = asyncio.create_task(
+            reconcile_active_counts_periodically()
+        )
+
     api_logger.info(f"✅ Service ready on port 8001")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if async_engine is not None:
+        await async_engine.dispose()
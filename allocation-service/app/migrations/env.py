@@ -0,0 +1,46 @@
+"""Alembic environment for the shared database schema.
+
+Fresh installs are owned by Base.metadata.create_all(), which each service
+runs on startup: it builds every table with the indexes and columns the
+models declare. The revisions in versions/ only upgrade databases created
+before those models changed, so each one skips tables that do not exist
+yet (migrations.helpers.existing_tables) and uses IF NOT EXISTS / existence
+checks to stay safe after create_all().
+"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine
+from database import DATABASE_URL, Base
+import models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running against a database"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(DATABASE_URL)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
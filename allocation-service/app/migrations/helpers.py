@@ -0,0 +1,14 @@
+"""Shared helpers for the revisions in versions/"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+def existing_tables(*offline_tables: str) -> set[str]:
+    """Names of the tables in the connected database
+
+    Offline (`alembic upgrade --sql`) there is nothing to inspect, so the
+    tables in `offline_tables` are assumed to exist and their DDL is emitted.
+    """
+    if context.is_offline_mode():
+        return set(offline_tables)
+    return set(sa.inspect(op.get_bind()).get_table_names())
@@ -0,0 +1,51 @@
+"""Indexes for hot filter columns
+
+Matches the real query shapes: pending requests ordered by created_at,
+ASSIGNED allocations per resource, allocation lists by status/timestamp,
+AVAILABLE resources and per-user notification feeds.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_requests_status_created_at", "requests", ["status", sa.text("created_at DESC")]),
+    ("ix_allocations_resource_id_status", "allocations", ["resource_id", "status"]),
+    ("ix_allocations_status_timestamp", "allocations", ["status", sa.text("timestamp DESC")]),
+    ("ix_allocations_request_id", "allocations", ["request_id"]),
+    ("ix_resources_status", "resources", ["status"]),
+    (
+        "ix_notifications_user_id_created_at",
+        "notifications",
+        ["user_id", sa.text("created_at DESC")],
+    ),
+]
+
+
+def upgrade() -> None:
+    tables = existing_tables(*(table for _, table, _ in INDEXES))
+    for name, table, columns in INDEXES:
+        if table in tables:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    tables = existing_tables(*(table for _, table, _ in INDEXES))
+    for name, table, _ in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table, if_exists=True)
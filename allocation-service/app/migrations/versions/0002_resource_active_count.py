@@ -0,0 +1,59 @@
+"""Denormalised active_count on resources
+
+Adds resources.active_count and backfills it from ASSIGNED allocations,
+unless resources already has the column.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from migrations.helpers import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = """
+UPDATE resources SET active_count = (
+    SELECT count(*) FROM allocations
+    WHERE allocations.resource_id = resources.resource_id
+      AND allocations.status = 'ASSIGNED'
+)
+"""
+
+
+def _resource_columns() -> set[str] | None:
+    """Column names of resources, or None when the table does not exist"""
+    if context.is_offline_mode():
+        return set()
+    if "resources" not in existing_tables():
+        return None
+    return {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("resources")
+    }
+
+
+def upgrade() -> None:
+    columns = _resource_columns()
+    if columns is None or "active_count" in columns:
+        return
+    op.add_column(
+        "resources",
+        sa.Column("active_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    columns = _resource_columns()
+    if context.is_offline_mode() or "active_count" in (columns or set()):
+        op.drop_column("resources", "active_count")
@@ -0,0 +1,40 @@
+"""Block sequences for ID_GENERATOR=sequence
+
+allocation_id_seq and request_id_seq advance by ID_BLOCK_SIZE per
+nextval(); services/ids.py hands out each block in-process. PostgreSQL
+only (other databases use the default ULID generator).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ID_BLOCK_SIZE = 1000
+SEQUENCES = ["allocation_id_seq", "request_id_seq"]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    for name in SEQUENCES:
+        op.execute(
+            f"CREATE SEQUENCE IF NOT EXISTS {name} START WITH 1 INCREMENT BY {ID_BLOCK_SIZE}"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+    for name in SEQUENCES:
+        op.execute(f"DROP SEQUENCE IF EXISTS {name}")
@@ -0,0 +1,51 @@
+"""Indexes for keyset pagination of request and allocation lists
+
+GET /requests and GET /allocations page newest first on
+(created_at, request_id) and (timestamp, allocation_id); these indexes
+serve every page as a range scan.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    (
+        "ix_requests_created_at_request_id",
+        "requests",
+        [sa.text("created_at DESC"), sa.text("request_id DESC")],
+    ),
+    (
+        "ix_allocations_timestamp_allocation_id",
+        "allocations",
+        [sa.text("timestamp DESC"), sa.text("allocation_id DESC")],
+    ),
+]
+
+
+def upgrade() -> None:
+    tables = existing_tables(*(table for _, table, _ in INDEXES))
+    for name, table, columns in INDEXES:
+        if table in tables:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    tables = existing_tables(*(table for _, table, _ in INDEXES))
+    for name, table, _ in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table, if_exists=True)
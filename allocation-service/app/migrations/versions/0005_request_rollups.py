@@ -0,0 +1,52 @@
+"""Request rollups per (status, urgency, service_id)
+
+Creates request_rollups and backfills it from the requests table. The
+table may already exist, empty, when another service's create_all() ran
+first; it is backfilled then too.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from migrations.helpers import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = """
+INSERT INTO request_rollups (status, urgency, service_id, request_count)
+SELECT status, urgency, service_id, count(*) FROM requests
+GROUP BY status, urgency, service_id
+"""
+
+
+def upgrade() -> None:
+    tables = existing_tables("requests")
+    if "requests" not in tables:
+        return
+    if "request_rollups" not in tables:
+        op.create_table(
+            "request_rollups",
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("urgency", sa.String(), primary_key=True),
+            sa.Column("service_id", sa.String(), primary_key=True),
+            sa.Column("request_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+    elif op.get_bind().execute(sa.text("SELECT count(*) FROM request_rollups")).scalar():
+        return
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    if context.is_offline_mode() or "request_rollups" in existing_tables():
+        op.drop_table("request_rollups")
@@ -0,0 +1,50 @@
+"""Rule set version row
+
+Creates rule_set_versions when create_all() has not, and seeds its single
+row, so every process starts from the same version and rule changes are
+counted from there. On fresh installs bump_rule_set_version() creates the
+row instead.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import existing_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEED = """
+INSERT INTO rule_set_versions (id, version, updated_at)
+SELECT 1, 1, CURRENT_TIMESTAMP
+WHERE NOT EXISTS (SELECT 1 FROM rule_set_versions WHERE id = 1)
+"""
+
+
+def upgrade() -> None:
+    tables = existing_tables("allocation_rules")
+    if "allocation_rules" not in tables:
+        return
+    if "rule_set_versions" not in tables:
+        op.create_table(
+            "rule_set_versions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+    op.execute(SEED)
+
+
+def downgrade() -> None:
+    # The row (and table) stay; create_all() would recreate the table anyway
+    pass
@@ -1,22 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from datetime import datetime
 from database import get_db
 from models import Request, Allocation
-from schemas import AllocationResponse, AllocateRequest, NotificationResponse
-from services.allocation import AllocationService
+from schemas import (
+    AllocationResponse,
+    AllocateRequest,
+    AllocationRelease,
+    NotificationResponse,
+    PendingQueueStats,
+)
+from services.allocation import AllocationService, RELEASE_STATUSES
+from services.solver import STRATEGIES
+from services.sharded import allocate_sharded
+from services.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, paginate, page_rows
+from services.export import EXPORT_FORMATS, export_response, export_statement, stream_rows
+from services.pending_queue import pending_queue
+from services.rule_cache import rule_cache
 
 router = APIRouter(prefix="/allocations", tags=["Allocations"])
 
 
+def filter_allocations(
+    query, status: str = None, since: datetime = None, until: datetime = None
+):
+    """Apply the allocation list filters to a Query or Select"""
+    if status:
+        query = query.where(Allocation.status == status)
+    if since:
+        query = query.where(Allocation.timestamp >= since)
+    if until:
+        query = query.where(Allocation.timestamp < until)
+    return query
+
+
 @router.get("", response_model=list[AllocationResponse])
-def get_allocations(status: str = None, db: Session = Depends(get_db)):
-    """Get all allocations"""
-    query = db.query(Allocation)
+def get_allocations(
+    response: Response,
+    status: str = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str = None,
+    db: Session = Depends(get_db),
+):
+    """Get allocations, newest first (`limit` per page, X-Next-Cursor -> `cursor`)"""
+    query = filter_allocations(db.query(Allocation), status)
 
-    if status:
-        query = query.filter(Allocation.status == status)
+    try:
+        query = paginate(query, Allocation.timestamp, Allocation.allocation_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return page_rows(
+        query.all(), limit, Allocation.timestamp, Allocation.allocation_id, response
+    )
 
-    return query.order_by(Allocation.timestamp.desc()).all()
+
+@router.get("/export")
+def export_allocations(
+    fmt: str = Query("ndjson", alias="format"),
+    status: str = None,
+    since: datetime = None,
+    until: datetime = None,
+):
+    """Stream matching allocations as NDJSON or CSV, oldest first
+
+    Same filters as GET /allocations, plus an optional timestamp range
+    [since, until).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})",
+        )
+    query = filter_allocations(
+        export_statement(Allocation, AllocationResponse), status, since, until
+    )
+    statement = query.order_by(Allocation.timestamp, Allocation.allocation_id)
+    fields = list(AllocationResponse.model_fields)
+    return export_response(stream_rows(statement, fields, fmt), fmt, "allocations")
 
 
 @router.post("/allocate", response_model=list[AllocationResponse])
@@ -24,7 +85,13 @@ def allocate(req: AllocateRequest = None, db: Session = Depends(get_db)):
     """Allocate pending requests to available resources"""
     if req and req.request_id:
         # Allocate specific request
-        request = db.query(Request).filter(Request.request_id == req.request_id).first()
+        # Row lock: a concurrent batch or call cannot assign it meanwhile
+        request = (
+            db.query(Request)
+            .filter(Request.request_id == req.request_id)
+            .with_for_update()
+            .first()
+        )
         if not request:
             raise HTTPException(status_code=404, detail="Request not found")
         if request.status != "PENDING":
@@ -36,10 +103,37 @@ def allocate(req: AllocateRequest = None, db: Session = Depends(get_db)):
         return [allocation]
     else:
         # Allocate all pending requests
-        allocations = AllocationService.allocate_pending_requests(db)
+        strategy = req.strategy if req else "greedy"
+        if strategy not in STRATEGIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})",
+            )
+        limit = req.limit if req else None
+        if req and req.sharded:
+            if limit is not None:
+                raise HTTPException(
+                    status_code=400, detail="limit is not supported for sharded allocation"
+                )
+            return allocate_sharded(db, strategy)
+        allocations = AllocationService.allocate_pending_requests(db, strategy, limit)
         return allocations
 
 
+@router.get("/queue", response_model=PendingQueueStats)
+def get_queue_stats():
+    """In-memory pending request queue statistics"""
+    return pending_queue.stats()
+
+
+@router.post("/queue/rebuild", response_model=PendingQueueStats)
+def rebuild_queue(db: Session = Depends(get_db)):
+    """Reload the rule set and pending request queue from the database"""
+    rule_cache.invalidate()
+    pending_queue.rebuild(db)
+    return pending_queue.stats()
+
+
 @router.get("/{allocation_id}", response_model=AllocationResponse)
 def get_allocation(allocation_id: str, db: Session = Depends(get_db)):
     """Get a specific allocation"""
@@ -51,6 +145,33 @@ def get_allocation(allocation_id: str, db: Session = Depends(get_db)):
     return allocation
 
 
+@router.post("/{allocation_id}/release", response_model=AllocationResponse)
+def release_allocation(
+    allocation_id: str, req: AllocationRelease = None, db: Session = Depends(get_db)
+):
+    """Complete or cancel an assigned allocation, freeing its resource slot"""
+    status = req.status if req else "COMPLETED"
+    if status not in RELEASE_STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown status: {status} (expected one of {', '.join(RELEASE_STATUSES)})",
+        )
+
+    # Row lock: two concurrent releases must not both decrement active_count
+    allocation = (
+        db.query(Allocation)
+        .filter(Allocation.allocation_id == allocation_id)
+        .with_for_update()
+        .first()
+    )
+    if not allocation:
+        raise HTTPException(status_code=404, detail="Allocation not found")
+    if allocation.status != "ASSIGNED":
+        raise HTTPException(status_code=400, detail="Allocation is not assigned")
+
+    return AllocationService.release_allocation(allocation, status, db)
+
+
 @router.get("/{allocation_id}/notification", response_model=NotificationResponse)
 def get_notification(allocation_id: str, db: Session = Depends(get_db)):
     """Get mock BiP notification for an allocation"""
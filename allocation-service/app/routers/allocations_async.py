@@ -0,0 +1,126 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from database import get_async_db
+from models import Allocation
+from schemas import AllocationResponse, NotificationResponse, PendingQueueStats
+from services.allocation import AllocationService
+from services.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, paginate, page_rows
+from services.export import (
+    EXPORT_FORMATS,
+    export_response,
+    export_statement,
+    stream_rows_async,
+)
+from services.pending_queue import pending_queue
+from routers import allocations as sync_allocations
+from routers.allocations import filter_allocations
+
+router = APIRouter(prefix="/allocations", tags=["Allocations"])
+
+# Allocating, releasing and queue rebuilds keep the sync handlers: they do
+# CPU-bound planning inside row-locking transactions and run in the
+# threadpool, off the event loop. Reads are served by the async session.
+
+
+@router.get("", response_model=list[AllocationResponse])
+async def get_allocations(
+    response: Response,
+    status: str = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get allocations, newest first (`limit` per page, X-Next-Cursor -> `cursor`)"""
+    query = filter_allocations(select(Allocation), status)
+
+    try:
+        query = paginate(query, Allocation.timestamp, Allocation.allocation_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.scalars(query)
+    return page_rows(
+        result.all(), limit, Allocation.timestamp, Allocation.allocation_id, response
+    )
+
+
+@router.get("/export")
+async def export_allocations(
+    fmt: str = Query("ndjson", alias="format"),
+    status: str = None,
+    since: datetime = None,
+    until: datetime = None,
+):
+    """Stream matching allocations as NDJSON or CSV, oldest first
+
+    Same filters as GET /allocations, plus an optional timestamp range
+    [since, until).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})",
+        )
+    query = filter_allocations(
+        export_statement(Allocation, AllocationResponse), status, since, until
+    )
+    statement = query.order_by(Allocation.timestamp, Allocation.allocation_id)
+    fields = list(AllocationResponse.model_fields)
+    return export_response(stream_rows_async(statement, fields, fmt), fmt, "allocations")
+
+
+router.add_api_route(
+    "/allocate",
+    sync_allocations.allocate,
+    methods=["POST"],
+    response_model=list[AllocationResponse],
+)
+
+
+@router.get("/queue", response_model=PendingQueueStats)
+def get_queue_stats():
+    """In-memory pending request queue statistics (sync: counts under the queue lock)"""
+    return pending_queue.stats()
+
+
+router.add_api_route(
+    "/queue/rebuild",
+    sync_allocations.rebuild_queue,
+    methods=["POST"],
+    response_model=PendingQueueStats,
+)
+
+
+@router.get("/{allocation_id}", response_model=AllocationResponse)
+async def get_allocation(allocation_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific allocation"""
+    allocation = await db.get(Allocation, allocation_id)
+    if not allocation:
+        raise HTTPException(status_code=404, detail="Allocation not found")
+    return allocation
+
+
+router.add_api_route(
+    "/{allocation_id}/release",
+    sync_allocations.release_allocation,
+    methods=["POST"],
+    response_model=AllocationResponse,
+)
+
+
+@router.get("/{allocation_id}/notification", response_model=NotificationResponse)
+async def get_notification(allocation_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get mock BiP notification for an allocation"""
+    # Relationships cannot lazy-load on an async session
+    allocation = await db.scalar(
+        select(Allocation)
+        .where(Allocation.allocation_id == allocation_id)
+        .options(selectinload(Allocation.request), selectinload(Allocation.resource))
+    )
+    if not allocation:
+        raise HTTPException(status_code=404, detail="Allocation not found")
+
+    return AllocationService.get_notification_message(allocation)
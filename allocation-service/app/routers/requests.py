@@ -1,14 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from models import Request, User
 from schemas import RequestCreate, RequestResponse
+from services.pending_queue import pending_queue
+from services.ids import new_id
+from services.request_rollups import reconcile_request_rollups, record_created
+from services.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, paginate, page_rows
+from services.export import EXPORT_FORMATS, export_response, export_statement, stream_rows
 from datetime import datetime
-import uuid
 
 router = APIRouter(prefix="/requests", tags=["Requests"])
 
 
+def filter_requests(
+    query,
+    user: User = None,
+    status: str = None,
+    urgency: str = None,
+    service_id: str = None,
+    since: datetime = None,
+    until: datetime = None,
+):
+    """Apply the request list filters to a Query or Select"""
+    if user and user.role == "USER" and user.service_id:
+        # User can only see requests for their service
+        query = query.where(Request.service_id == user.service_id)
+    if status:
+        query = query.where(Request.status == status)
+    if urgency:
+        query = query.where(Request.urgency == urgency)
+    if service_id:
+        query = query.where(Request.service_id == service_id)
+    if since:
+        query = query.where(Request.created_at >= since)
+    if until:
+        query = query.where(Request.created_at < until)
+    return query
+
+
 @router.post("", response_model=RequestResponse)
 def create_request(req: RequestCreate, db: Session = Depends(get_db)):
     """Create a new service request"""
@@ -29,7 +59,7 @@ def create_request(req: RequestCreate, db: Session = Depends(get_db)):
 
     # Create request
     new_request = Request(
-        request_id=f"REQ-{uuid.uuid4().hex[:6].upper()}",
+        request_id=new_id("REQ"),
         user_id=req.user_id,
         service_id=req.service_id,
         request_type_id=req.request_type_id,
@@ -39,46 +69,94 @@ def create_request(req: RequestCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_request)
+    record_created(db, new_request.urgency, new_request.service_id)
     db.commit()
     db.refresh(new_request)
 
+    pending_queue.push(new_request, user.city)
+
     return new_request
 
 
 @router.get("", response_model=list[RequestResponse])
 def get_requests(
+    response: Response,
     user_id: str = None,
     status: str = None,
     urgency: str = None,
     service_id: str = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str = None,
     db: Session = Depends(get_db),
 ):
     """Get requests with optional filters
 
     - If user_id provided (USER role): automatically filters by user's service
     - If no user_id (ADMIN): returns all requests or filtered by service_id
+    - Newest first, `limit` per page; pass X-Next-Cursor back as `cursor`
     """
-    query = db.query(Request)
+    # If user_id is provided, filter by that user's service (for USER role);
+    # admins see all, optionally filtered by service_id
+    user = db.query(User).filter(User.user_id == user_id).first() if user_id else None
+    query = filter_requests(db.query(Request), user, status, urgency, service_id)
 
-    # If user_id is provided, filter by that user's service (for USER role)
-    if user_id:
-        user = db.query(User).filter(User.user_id == user_id).first()
-        if user and user.role == "USER" and user.service_id:
-            # User can only see requests for their service
-            query = query.filter(Request.service_id == user.service_id)
-        elif user and user.role == "ADMIN":
-            # Admin can see all, but can filter by service_id if provided
-            pass
+    try:
+        query = paginate(query, Request.created_at, Request.request_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Apply other filters
-    if status:
-        query = query.filter(Request.status == status)
-    if urgency:
-        query = query.filter(Request.urgency == urgency)
-    if service_id:
-        query = query.filter(Request.service_id == service_id)
+    return page_rows(query.all(), limit, Request.created_at, Request.request_id, response)
+
+
+@router.get("/export")
+def export_requests(
+    fmt: str = Query("ndjson", alias="format"),
+    user_id: str = None,
+    status: str = None,
+    urgency: str = None,
+    service_id: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    db: Session = Depends(get_db),
+):
+    """Stream matching requests as NDJSON or CSV, oldest first
 
-    return query.order_by(Request.created_at.desc()).all()
+    Same filters as GET /requests, plus an optional created_at range
+    [since, until).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})",
+        )
+    user = db.query(User).filter(User.user_id == user_id).first() if user_id else None
+    query = export_statement(Request, RequestResponse)
+    query = filter_requests(query, user, status, urgency, service_id, since, until)
+    statement = query.order_by(Request.created_at, Request.request_id)
+    fields = list(RequestResponse.model_fields)
+    return export_response(stream_rows(statement, fields, fmt), fmt, "requests")
+
+
+def rollup_drift_response(drift: dict) -> dict:
+    return {
+        "corrected": len(drift),
+        "groups": [
+            {
+                "status": status,
+                "urgency": urgency,
+                "service_id": service_id,
+                "stored": stored,
+                "actual": actual,
+            }
+            for (status, urgency, service_id), (stored, actual) in drift.items()
+        ],
+    }
+
+
+@router.post("/rollups/reconcile")
+def reconcile_rollups(db: Session = Depends(get_db)):
+    """Rebuild request rollups from the requests table; returns the corrections"""
+    return rollup_drift_response(reconcile_request_rollups(db))
 
 
 @router.get("/{request_id}", response_model=RequestResponse)
@@ -0,0 +1,154 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import Request, User
+from schemas import RequestCreate, RequestResponse
+from services.pending_queue import pending_queue
+from services.ids import new_id
+from services.request_rollups import reconcile_request_rollups, record_created
+from services.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, paginate, page_rows
+from services.export import (
+    EXPORT_FORMATS,
+    export_response,
+    export_statement,
+    stream_rows_async,
+)
+from routers.requests import filter_requests, rollup_drift_response
+from datetime import datetime
+
+router = APIRouter(prefix="/requests", tags=["Requests"])
+
+
+@router.post("", response_model=RequestResponse)
+async def create_request(req: RequestCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new service request"""
+    # Verify user exists
+    user = await db.get(User, req.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Validate: user can only create requests for their own service
+    if user.role == "USER":
+        if not user.service_id:
+            raise HTTPException(status_code=400, detail="User has no service assigned")
+        if req.service_id != user.service_id:
+            raise HTTPException(
+                status_code=403,
+                detail=f"User can only create requests for their service: {user.service_id}",
+            )
+
+    # Create request; with ID_GENERATOR=sequence new_id() may fetch the next
+    # id block from the database, so it runs off the event loop
+    new_request = Request(
+        request_id=await run_in_threadpool(new_id, "REQ"),
+        user_id=req.user_id,
+        service_id=req.service_id,
+        request_type_id=req.request_type_id,
+        urgency=req.urgency,
+        created_at=datetime.utcnow(),
+        status="PENDING",
+    )
+
+    db.add(new_request)
+    await db.run_sync(
+        lambda session: record_created(session, new_request.urgency, new_request.service_id)
+    )
+    await db.commit()
+
+    # The queue lock may be held by a batch drain or a rescore
+    await run_in_threadpool(pending_queue.push, new_request, user.city)
+
+    return new_request
+
+
+@router.get("", response_model=list[RequestResponse])
+async def get_requests(
+    response: Response,
+    user_id: str = None,
+    status: str = None,
+    urgency: str = None,
+    service_id: str = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get requests with optional filters
+
+    - If user_id provided (USER role): automatically filters by user's service
+    - If no user_id (ADMIN): returns all requests or filtered by service_id
+    - Newest first, `limit` per page; pass X-Next-Cursor back as `cursor`
+    """
+    # If user_id is provided, filter by that user's service (for USER role)
+    user = await db.get(User, user_id) if user_id else None
+    query = filter_requests(select(Request), user, status, urgency, service_id)
+
+    try:
+        query = paginate(query, Request.created_at, Request.request_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.scalars(query)
+    return page_rows(result.all(), limit, Request.created_at, Request.request_id, response)
+
+
+@router.get("/export")
+async def export_requests(
+    fmt: str = Query("ndjson", alias="format"),
+    user_id: str = None,
+    status: str = None,
+    urgency: str = None,
+    service_id: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream matching requests as NDJSON or CSV, oldest first
+
+    Same filters as GET /requests, plus an optional created_at range
+    [since, until).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})",
+        )
+    user = await db.get(User, user_id) if user_id else None
+    query = export_statement(Request, RequestResponse)
+    query = filter_requests(query, user, status, urgency, service_id, since, until)
+    statement = query.order_by(Request.created_at, Request.request_id)
+    fields = list(RequestResponse.model_fields)
+    return export_response(stream_rows_async(statement, fields, fmt), fmt, "requests")
+
+
+@router.post("/rollups/reconcile")
+async def reconcile_rollups(db: AsyncSession = Depends(get_async_db)):
+    """Rebuild request rollups from the requests table; returns the corrections"""
+    return rollup_drift_response(await db.run_sync(reconcile_request_rollups))
+
+
+@router.get("/{request_id}", response_model=RequestResponse)
+async def get_request(
+    request_id: str, user_id: str = None, db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific request by ID
+
+    - USER can only view requests in their service
+    - ADMIN can view any request
+    """
+    request = await db.get(Request, request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    # Check if user has permission to view this request
+    if user_id:
+        user = await db.get(User, user_id)
+        if user and user.role == "USER" and user.service_id:
+            if request.service_id != user.service_id:
+                raise HTTPException(
+                    status_code=403,
+                    detail="You can only view requests for your service",
+                )
+
+    return request
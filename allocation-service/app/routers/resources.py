@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import Resource
 from schemas import ResourceResponse
+from services.active_counts import reconcile_active_counts
 
 router = APIRouter(prefix="/resources", tags=["Resources"])
 
@@ -27,6 +28,19 @@ def get_resources(
     return query.all()
 
 
+@router.post("/reconcile")
+def reconcile_resources(db: Session = Depends(get_db)):
+    """Recompute active_count from ASSIGNED allocations; returns the corrections"""
+    drift = reconcile_active_counts(db)
+    return {
+        "corrected": len(drift),
+        "resources": {
+            resource_id: {"stored": stored, "actual": actual}
+            for resource_id, (stored, actual) in drift.items()
+        },
+    }
+
+
 @router.get("/{resource_id}", response_model=ResourceResponse)
 def get_resource(resource_id: str, db: Session = Depends(get_db)):
     """Get a specific resource by ID"""
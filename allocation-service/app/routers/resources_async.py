@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import Resource
+from schemas import ResourceResponse
+from services.active_counts import reconcile_active_counts
+
+router = APIRouter(prefix="/resources", tags=["Resources"])
+
+
+@router.get("", response_model=list[ResourceResponse])
+async def get_resources(
+    status: str = None,
+    city: str = None,
+    resource_type: str = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all resources with optional filters"""
+    query = select(Resource)
+
+    if status:
+        query = query.where(Resource.status == status)
+    if city:
+        query = query.where(Resource.city == city)
+    if resource_type:
+        query = query.where(Resource.resource_type == resource_type)
+
+    result = await db.scalars(query)
+    return result.all()
+
+
+@router.post("/reconcile")
+async def reconcile_resources(db: AsyncSession = Depends(get_async_db)):
+    """Recompute active_count from ASSIGNED allocations; returns the corrections"""
+    drift = await db.run_sync(reconcile_active_counts)
+    return {
+        "corrected": len(drift),
+        "resources": {
+            resource_id: {"stored": stored, "actual": actual}
+            for resource_id, (stored, actual) in drift.items()
+        },
+    }
+
+
+@router.get("/{resource_id}", response_model=ResourceResponse)
+async def get_resource(resource_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific resource by ID"""
+    resource = await db.get(Resource, resource_id)
+    if not resource:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return resource
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import AllocationRule
 from schemas import AllocationRuleResponse, AllocationRuleUpdate
+from services.pending_queue import pending_queue
+from services.rule_cache import rule_cache
 
 router = APIRouter(prefix="/rules", tags=["Allocation Rules"])
 
@@ -27,6 +29,14 @@ def update_rule(
     if update.is_active is not None:
         rule.is_active = update.is_active
 
+    # Invalidate cached rule sets in every worker
+    rule_cache.bump_version(db)
+
     db.commit()
     db.refresh(rule)
+
+    # Rescore queued requests with the new rule set
+    if pending_queue.ready:
+        pending_queue.rescore(rule_cache.get(db))
+
     return rule
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import AllocationRule
+from schemas import AllocationRuleResponse, AllocationRuleUpdate
+from services.pending_queue import pending_queue
+from services.rule_cache import rule_cache
+
+router = APIRouter(prefix="/rules", tags=["Allocation Rules"])
+
+
+@router.get("", response_model=list[AllocationRuleResponse])
+async def get_rules(db: AsyncSession = Depends(get_async_db)):
+    """Get all allocation rules"""
+    result = await db.scalars(select(AllocationRule))
+    return result.all()
+
+
+@router.put("/{rule_id}", response_model=AllocationRuleResponse)
+async def update_rule(
+    rule_id: str, update: AllocationRuleUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    """Update an allocation rule"""
+    rule = await db.get(AllocationRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+
+    if update.weight is not None:
+        rule.weight = update.weight
+    if update.is_active is not None:
+        rule.is_active = update.is_active
+
+    # Invalidate cached rule sets in every worker
+    await db.run_sync(rule_cache.bump_version)
+
+    await db.commit()
+
+    # Rescore queued requests with the new rule set (O(N log N) under the
+    # queue lock, so off the event loop)
+    if pending_queue.ready:
+        rule_set = await db.run_sync(rule_cache.get)
+        await run_in_threadpool(pending_queue.rescore, rule_set)
+
+    return rule
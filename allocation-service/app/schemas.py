@@ -25,6 +25,8 @@ class ResourceBase(BaseModel):
 
 
 class ResourceResponse(ResourceBase):
+    active_count: int = 0  # ASSIGNED allocations (denormalised)
+
     class Config:
         from_attributes = True
 
@@ -43,7 +45,7 @@ class RequestResponse(BaseModel):
     service_id: str
     request_type_id: str
     urgency: str
-    created_at: datetime
+    created_at: Optional[datetime] = None
     status: str
 
     class Config:
@@ -57,7 +59,7 @@ class AllocationResponse(BaseModel):
     resource_id: str
     priority_score: float
     status: str
-    timestamp: datetime
+    timestamp: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -65,6 +67,21 @@ class AllocationResponse(BaseModel):
 
 class AllocateRequest(BaseModel):
     request_id: Optional[str] = None  # If None, allocate all pending
+    strategy: str = "greedy"  # Batch mode: greedy or optimal
+    limit: Optional[int] = None  # Max requests to allocate in a batch
+    sharded: bool = False  # Allocate per city in parallel, then a global pass
+
+
+class AllocationRelease(BaseModel):
+    status: str = "COMPLETED"  # COMPLETED or CANCELLED
+
+
+class PendingQueueStats(BaseModel):
+    ready: bool
+    pending: int
+    capped: int
+    uncapped: int
+    rules: int
 
 
 # AllocationRule Schemas
@@ -0,0 +1,80 @@
+"""Denormalised Resource.active_count maintenance.
+
+Resource.active_count mirrors the number of ASSIGNED allocations on a
+resource, so capacity checks and utilisation figures read one column
+instead of counting the allocations table. The counter is changed with
+relative UPDATEs (active_count = active_count + n) inside the same
+transaction that creates or releases the allocations; the caller commits.
+
+reconcile_active_counts() recomputes the counters from the allocations
+table and repairs any drift (manual SQL, rows written by older code; see
+services/drift.py).
+"""
+import os
+from collections import Counter
+from typing import Iterable
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from models import Resource, Allocation
+from services.drift import repair_drift
+
+# Seconds between background reconciliation runs (0 disables the job)
+ACTIVE_COUNT_RECONCILE_SECONDS = int(
+    os.getenv("ACTIVE_COUNT_RECONCILE_SECONDS", "300")
+)
+
+_resources = Resource.__table__
+
+# Executemany-friendly relative update, one parameter set per resource
+_adjust_statement = (
+    update(_resources)
+    .where(_resources.c.resource_id == bindparam("target_id"))
+    .values(active_count=_resources.c.active_count + bindparam("delta"))
+)
+
+
+def adjust_active_counts(db: Session, deltas: dict[str, int]) -> None:
+    """Add a signed delta to each resource's active_count (no commit)"""
+    params = [
+        {"target_id": resource_id, "delta": delta}
+        for resource_id, delta in deltas.items()
+        if delta
+    ]
+    if params:
+        db.execute(_adjust_statement, params)
+
+
+def record_assigned(db: Session, resource_ids: Iterable[str]) -> None:
+    """Count new ASSIGNED allocations on their resources (no commit)"""
+    adjust_active_counts(db, Counter(resource_ids))
+
+
+def record_released(db: Session, resource_id: str) -> None:
+    """Count one ASSIGNED allocation leaving its resource (no commit)"""
+    adjust_active_counts(db, {resource_id: -1})
+
+
+def reconcile_active_counts(db: Session) -> dict[str, tuple[int, int]]:
+    """Recompute active_count from ASSIGNED allocations and fix drift
+
+    Returns {resource_id: (stored, actual)} for every corrected resource.
+    """
+    # Correlated count, so stored and actual are read by one statement
+    assigned = (
+        select(func.count(Allocation.allocation_id))
+        .where(
+            Allocation.resource_id == Resource.resource_id,
+            Allocation.status == "ASSIGNED",
+        )
+        .correlate(Resource)
+        .scalar_subquery()
+    )
+    rows = db.query(Resource.resource_id, Resource.active_count, assigned).all()
+
+    drift = {
+        resource_id: (stored or 0, actual)
+        for resource_id, stored, actual in rows
+        if (stored or 0) != actual
+    }
+    repair_drift(db, drift, adjust_active_counts, "active_count", "resources")
+    return drift
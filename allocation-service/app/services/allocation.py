@@ -0,0 +1,472 @@
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from models import Request, Resource, Allocation, AllocationRule
+from datetime import datetime
+from logging_config import allocation_logger
+from services.rule_engine import CompiledRuleSet, compile_rules
+from services.rule_cache import rule_cache
+from services.capacity import CapacityTracker, SAME_CITY_BONUS
+from services.solver import assign_batch
+from services.priority import waiting_bonus
+from services.vectorized import load_pending_columns, scored_candidates
+from services.pending_queue import pending_queue
+from services.active_counts import record_assigned, record_released
+from services.request_rollups import record_transition
+from services.ids import new_id, new_ids
+import logging
+import os
+import time
+
+# Rows per bulk INSERT/UPDATE statement when writing a batch
+ALLOCATION_CHUNK_SIZE = int(os.getenv("ALLOCATION_CHUNK_SIZE", "1000"))
+
+# Request ids per SELECT ... FOR UPDATE SKIP LOCKED claim statement
+CLAIM_CHUNK_SIZE = int(os.getenv("CLAIM_CHUNK_SIZE", "1000"))
+
+# Final allocation states; both free a slot on the resource
+RELEASE_STATUSES = ("COMPLETED", "CANCELLED")
+
+
+class AllocationService:
+    @staticmethod
+    def calculate_priority(
+        request: Request,
+        rules: list[AllocationRule] | CompiledRuleSet,
+        db: Session,
+        as_of: datetime | None = None,
+    ) -> float:
+        """Calculate priority score based on active rules
+
+        as_of fixes the moment waiting time is measured against (default: now)
+        """
+        rule_set = compile_rules(rules)
+        score, matched_rules = rule_set.score(request)
+
+        # Add waiting time bonus (2 points per hour, max 20)
+        bonus = waiting_bonus(request.created_at, as_of or datetime.utcnow())
+        score += bonus
+
+        if allocation_logger.isEnabledFor(logging.DEBUG):
+            allocation_logger.debug(
+                f"Priority calculated for {request.request_id}: "
+                f"base={score - bonus:.1f}, waiting_bonus={bonus:.1f}, "
+                f"total={score:.1f}, rules={matched_rules}"
+            )
+
+        return score
+
+    @staticmethod
+    def find_best_resource(
+        request: Request, db: Session, capacity: CapacityTracker | None = None
+    ) -> Resource | None:
+        """Find the best available resource for a request
+
+        Batches pass a shared CapacityTracker so resource counts are loaded
+        once instead of once per resource per request.
+        """
+        # Get user's city from the request
+        user = request.user
+        user_city = user.city if user else None
+
+        if capacity is None:
+            capacity = CapacityTracker.load(db)
+
+        best_resource, best_score = capacity.best_for(user_city)
+
+        if best_resource:
+            allocation_logger.debug(
+                f"Best resource for {request.request_id}: {best_resource.resource_id} "
+                f"(city={best_resource.city}, score={best_score})"
+            )
+        else:
+            allocation_logger.warning(f"No available resource for {request.request_id}")
+
+        return best_resource
+
+    @staticmethod
+    def claim_best_resource(request: Request, db: Session) -> Resource | None:
+        """Row-lock the best resource for a request that still has a free slot
+
+        Resources are ranked from an unlocked read; only the chosen row is
+        locked (FOR UPDATE SKIP LOCKED) with its capacity re-checked. A
+        resource locked by another allocation or filled meanwhile is
+        skipped for the next best one. When all were skipped, they are
+        retried blocking, best first; no other lock is held then, so the
+        waits cannot deadlock.
+        """
+        user = request.user
+        user_city = user.city if user else None
+        capacity = CapacityTracker.load(db)
+
+        skipped = []
+        while True:
+            resource, _ = capacity.best_for(user_city)
+            if resource is None:
+                break
+            capacity.exclude(resource.resource_id)
+            locked = AllocationService._lock_resource(db, resource.resource_id, True)
+            if locked is not None:
+                return locked
+            skipped.append(resource.resource_id)
+
+        for resource_id in skipped:
+            locked = AllocationService._lock_resource(db, resource_id, False)
+            if locked is not None:
+                return locked
+        return None
+
+    @staticmethod
+    def _lock_resource(db: Session, resource_id: str, skip_locked: bool) -> Resource | None:
+        """Lock one AVAILABLE resource row if it still has a free slot"""
+        return (
+            db.query(Resource)
+            .filter(
+                Resource.resource_id == resource_id,
+                Resource.status == "AVAILABLE",
+                Resource.active_count < Resource.capacity,
+            )
+            .with_for_update(skip_locked=skip_locked)
+            .populate_existing()
+            .first()
+        )
+
+    @staticmethod
+    def allocate_request(
+        request: Request, db: Session, capacity: CapacityTracker | None = None
+    ) -> Allocation | None:
+        """Allocate a single request to best available resource"""
+        allocation_logger.info(f"📋 Allocating request {request.request_id}...")
+
+        # Get allocation rules (cached until the rule-set version changes)
+        rules = rule_cache.get(db)
+
+        # Calculate priority
+        priority_score = AllocationService.calculate_priority(request, rules, db)
+
+        # Find best resource; without a batch tracker only the chosen
+        # resource row is locked, so single allocations do not serialise
+        if capacity is None:
+            resource = AllocationService.claim_best_resource(request, db)
+        else:
+            resource = AllocationService.find_best_resource(request, db, capacity)
+
+        if not resource:
+            allocation_logger.warning(
+                f"❌ Could not allocate {request.request_id}: No available resources"
+            )
+            db.rollback()  # release the request lock
+            return None
+
+        # Create allocation
+        allocation = Allocation(
+            allocation_id=new_id("AL"),
+            request_id=request.request_id,
+            resource_id=resource.resource_id,
+            priority_score=priority_score,
+            status="ASSIGNED",
+            timestamp=datetime.utcnow(),
+        )
+
+        # Update request status
+        request.status = "ASSIGNED"
+
+        db.add(allocation)
+        record_assigned(db, [allocation.resource_id])
+        record_transition(db, [(request.urgency, request.service_id)], "PENDING", "ASSIGNED")
+        db.commit()
+        db.refresh(allocation)
+
+        if capacity is not None:
+            capacity.assign(allocation.resource_id)
+        pending_queue.discard([allocation.request_id])
+
+        allocation_logger.info(
+            f"✅ Allocated {request.request_id} → {resource.resource_id} "
+            f"(priority={priority_score:.1f})"
+        )
+
+        return allocation
+
+    @staticmethod
+    def allocate_pending_requests(
+        db: Session, strategy: str = "greedy", limit: int | None = None
+    ) -> list[Allocation]:
+        """Allocate pending requests by priority
+
+        strategy: "greedy" (locally best resource per request) or "optimal"
+        (batch-wide assignment, see services.solver)
+        limit: allocate at most this many requests
+
+        Greedy batches drain the in-memory pending queue: only as many top
+        requests as there is free capacity are taken, in O(K log N). The
+        queue first loads the requests created since its last scan, so
+        requests created on other replicas are included. The optimal strategy needs every
+        candidate and scans the table.
+
+        Safe to run from several workers at once: the batch row-locks the
+        resources it fills and the requests it assigns (FOR UPDATE SKIP
+        LOCKED), so concurrent batches work on disjoint rows.
+        """
+        # Claim resources with free capacity (only enough for `limit` when
+        # set, so parallel workers get the rest); the locks are held until
+        # the batch commits and counts are tracked in memory meanwhile
+        capacity = CapacityTracker.load(db, lock=True, skip_locked=True, min_free=limit)
+        as_of = datetime.utcnow()
+
+        take = capacity.total_free()
+        if limit is not None:
+            take = min(take, limit)
+        if take <= 0:
+            db.rollback()  # release the resource locks
+            allocation_logger.info("🔄 Batch allocation skipped: no free capacity")
+            return []
+
+        if strategy == "greedy" and pending_queue.ready:
+            # Another worker may have changed the rules since the last batch
+            rule_set = rule_cache.get(db)
+            if rule_set is not pending_queue.rule_set:
+                pending_queue.rescore(rule_set)
+            pending_queue.reconcile_new(db)
+
+            popped = pending_queue.pop(take, as_of)
+            try:
+                candidates = AllocationService.claim_candidates(db, popped, take)
+            except Exception:
+                pending_queue.restore([entry for entry, _, _ in popped])
+                raise
+            claimed_ids = {entry.request_id for entry, _, _ in candidates}
+            from_queue = True
+
+            # Skipped entries were either assigned by another worker or are
+            # locked by one right now; keep only those still pending
+            skipped = [entry for entry, _, _ in popped if entry.request_id not in claimed_ids]
+            if skipped:
+                still_pending = AllocationService.pending_ids(
+                    db, [entry.request_id for entry in skipped]
+                )
+                pending_queue.restore(
+                    [entry for entry in skipped if entry.request_id in still_pending]
+                )
+            allocation_logger.info(
+                f"🔄 Starting batch allocation: {len(candidates)}/{len(popped)} requests "
+                f"claimed from pending queue ({len(pending_queue)} left, strategy={strategy})"
+            )
+        else:
+            scored = AllocationService.load_candidates(db, as_of)
+            if limit is not None:
+                scored = scored[:limit]
+            # The optimal solver may swap in a lower-priority request that
+            # earns the same-city bonus, so claim that band as well
+            margin = SAME_CITY_BONUS if strategy == "optimal" else 0
+            candidates = AllocationService.claim_candidates(db, scored, take, margin)
+            from_queue = False
+            allocation_logger.info(
+                f"🔄 Starting batch allocation: {len(candidates)}/{len(scored)} pending "
+                f"requests claimed (strategy={strategy})"
+            )
+
+        # Plan every assignment in memory, then write them in one transaction
+        assignments = assign_batch(candidates, capacity, strategy)
+
+        rows = AllocationService.allocation_rows(assignments)
+
+        assigned_ids = {row["request_id"] for row in rows}
+        try:
+            AllocationService.write_allocations(rows, db)
+        except Exception:
+            db.rollback()
+            if from_queue:
+                pending_queue.restore([entry for entry, _, _ in candidates])
+            raise
+
+        if from_queue:
+            pending_queue.restore(
+                [entry for entry, _, _ in candidates if entry.request_id not in assigned_ids]
+            )
+        else:
+            pending_queue.discard(assigned_ids)
+
+        allocation_logger.info(
+            f"✅ Batch allocation complete: {len(rows)}/{len(candidates)} requests allocated"
+        )
+
+        return [Allocation(**row) for row in rows]
+
+    @staticmethod
+    def allocation_rows(assignments: list[tuple]) -> list[dict]:
+        """Allocation row dicts for (request, resource, priority) assignments"""
+        timestamp = datetime.utcnow()
+        allocation_ids = new_ids("AL", len(assignments))
+        return [
+            {
+                "allocation_id": allocation_id,
+                "request_id": req.request_id,
+                "resource_id": resource.resource_id,
+                "priority_score": priority,
+                "status": "ASSIGNED",
+                "timestamp": timestamp,
+            }
+            for allocation_id, (req, resource, priority) in zip(allocation_ids, assignments)
+        ]
+
+    @staticmethod
+    def claim_candidates(
+        db: Session, candidates: list[tuple], take: int, margin: float = 0
+    ) -> list[tuple]:
+        """Row-lock the best `take` candidates that are still PENDING
+
+        Candidates are (row, city, priority) tuples, best first. Requests
+        locked by another worker or no longer PENDING are skipped and the
+        next best ones are tried instead. With a margin, candidates within
+        `margin` of the last claimed priority are claimed too. Locks are
+        held until the caller commits or rolls back.
+        """
+        claimed = []
+        position = 0
+        while position < len(candidates) and len(claimed) < take:
+            size = min(take - len(claimed), CLAIM_CHUNK_SIZE)
+            chunk = candidates[position : position + size]
+            position += size
+            claimed.extend(AllocationService._claim(db, chunk))
+
+        if margin and claimed and len(claimed) >= take:
+            floor = claimed[-1][2] - margin
+            band = []
+            for candidate in candidates[position:]:
+                if candidate[2] < floor:
+                    break
+                band.append(candidate)
+            for offset in range(0, len(band), CLAIM_CHUNK_SIZE):
+                claimed.extend(
+                    AllocationService._claim(db, band[offset : offset + CLAIM_CHUNK_SIZE])
+                )
+        return claimed
+
+    @staticmethod
+    def _claim(db: Session, chunk: list[tuple]) -> list[tuple]:
+        if not chunk:
+            return []
+        locked = {
+            request_id
+            for (request_id,) in db.query(Request.request_id)
+            .filter(
+                Request.request_id.in_([row.request_id for row, _, _ in chunk]),
+                Request.status == "PENDING",
+            )
+            .with_for_update(skip_locked=True)
+        }
+        return [candidate for candidate in chunk if candidate[0].request_id in locked]
+
+    @staticmethod
+    def pending_ids(db: Session, request_ids: list[str]) -> set[str]:
+        """Subset of request_ids whose status is still PENDING (no locks)"""
+        pending = set()
+        for offset in range(0, len(request_ids), CLAIM_CHUNK_SIZE):
+            chunk = request_ids[offset : offset + CLAIM_CHUNK_SIZE]
+            pending.update(
+                request_id
+                for (request_id,) in db.query(Request.request_id).filter(
+                    Request.request_id.in_(chunk), Request.status == "PENDING"
+                )
+            )
+        return pending
+
+    @staticmethod
+    def load_candidates(
+        db: Session, as_of: datetime, cities: list[str] | None = None
+    ) -> list[tuple]:
+        """Score every PENDING request (or those from `cities`):
+        (row, city, priority), best first
+
+        Rows are loaded as columns and scored with NumPy (services.vectorized).
+        """
+        # Get rules for priority calculation (cached until the version changes)
+        rules = rule_cache.get(db)
+
+        columns = load_pending_columns(db, cities)
+        return scored_candidates(rules, columns, as_of)
+
+    @staticmethod
+    def write_allocations(
+        rows: list[dict], db: Session, chunk_size: int = ALLOCATION_CHUNK_SIZE
+    ) -> None:
+        """Bulk insert allocation rows and mark their (claimed, PENDING)
+        requests ASSIGNED
+
+        Statements are sent in chunks of `chunk_size` rows; everything,
+        including the resources' active_count and the request rollups, is
+        committed as a single transaction.
+        """
+        if not rows:
+            return
+
+        start = time.perf_counter()
+        groups = []
+        for offset in range(0, len(rows), chunk_size):
+            chunk = rows[offset : offset + chunk_size]
+            db.execute(insert(Allocation), chunk)
+            # RETURNING gives the rollup group of every updated request
+            groups.extend(
+                db.execute(
+                    update(Request)
+                    .where(Request.request_id.in_([row["request_id"] for row in chunk]))
+                    .values(status="ASSIGNED")
+                    .returning(Request.urgency, Request.service_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            )
+        record_assigned(db, (row["resource_id"] for row in rows))
+        record_transition(db, (tuple(group) for group in groups), "PENDING", "ASSIGNED")
+        db.commit()
+        elapsed = time.perf_counter() - start
+
+        written = len(rows) * 2  # allocation inserts + request updates
+        allocation_logger.info(
+            f"💾 Wrote {len(rows)} allocations in {elapsed * 1000:.1f}ms "
+            f"({written / elapsed if elapsed > 0 else 0:.0f} rows/s)",
+            extra={
+                "duration_ms": round(elapsed * 1000, 2),
+                "extra_data": {"rows": written, "chunk_size": chunk_size},
+            },
+        )
+
+    @staticmethod
+    def release_allocation(allocation: Allocation, status: str, db: Session) -> Allocation:
+        """Close an ASSIGNED allocation as COMPLETED or CANCELLED
+
+        A completed allocation completes its request; a cancelled one puts
+        the request back into the pending queue. The resource's active_count
+        and the request rollups are updated in the same transaction.
+        """
+        allocation.status = status
+        request = allocation.request
+        previous_status = request.status
+        request.status = "COMPLETED" if status == "COMPLETED" else "PENDING"
+        record_released(db, allocation.resource_id)
+        record_transition(
+            db, [(request.urgency, request.service_id)], previous_status, request.status
+        )
+        db.commit()
+        db.refresh(allocation)
+
+        if request.status == "PENDING":
+            user = request.user
+            pending_queue.push(request, user.city if user else None)
+
+        allocation_logger.info(
+            f"🔓 Released {allocation.allocation_id} on {allocation.resource_id} "
+            f"({status})"
+        )
+        return allocation
+
+    @staticmethod
+    def get_notification_message(allocation: Allocation) -> dict:
+        """Generate mock BiP notification"""
+        message = {
+            "user_id": allocation.request.user_id,
+            "message": f"Talebiniz öncelikli olarak işleme alındı. {allocation.resource.resource_type} yönlendirildi.",
+        }
+        allocation_logger.info(
+            f"📱 BiP notification prepared for user {allocation.request.user_id}"
+        )
+        return message
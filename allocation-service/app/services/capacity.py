@@ -0,0 +1,180 @@
+"""In-memory resource capacity tracking for allocation batches.
+
+Active (ASSIGNED) allocation counts are read from the denormalised
+Resource.active_count column in the same query as the resources;
+assignments made during the batch update the counters in memory.
+
+Resources are kept in max-heaps on free capacity: one per city plus a
+global one. A resource's score for a request is its free capacity plus
+SAME_CITY_BONUS when the cities match, so the best pick is always either
+the top of the requester's city heap or the top of the global heap.
+"""
+import heapq
+from sqlalchemy.orm import Session
+from models import Resource
+
+# Score bonus for a resource in the requester's city
+SAME_CITY_BONUS = 10
+
+# Resources row-locked per round when a batch claims only what it needs
+RESOURCE_CLAIM_BATCH = 20
+
+
+class CapacityTracker:
+    """Available resources and their running active-allocation counts"""
+
+    def __init__(self, resources: list[Resource], active_counts: dict[str, int]):
+        self.resources = resources
+        # Plain-value snapshot: per-allocation commits expire the ORM objects,
+        # and re-reading their attributes would reload every resource again
+        self.slots = [
+            (resource, resource.resource_id, resource.capacity, resource.city)
+            for resource in resources
+        ]
+        self.active_counts = {
+            resource_id: active_counts.get(resource_id, 0)
+            for _, resource_id, _, _ in self.slots
+        }
+        self._position = {
+            resource_id: position
+            for position, (_, resource_id, _, _) in enumerate(self.slots)
+        }
+
+        # Heap entries are (-free, load position); the load position keeps
+        # the first-wins tie-breaking of a linear scan. Stale entries are
+        # dropped lazily when they reach the top.
+        self._global_heap = []
+        self._city_heaps: dict[str, list] = {}
+        for position, (_, resource_id, capacity, city) in enumerate(self.slots):
+            free = capacity - self.active_counts[resource_id]
+            if free > 0:
+                self._global_heap.append((-free, position))
+                self._city_heaps.setdefault(city, []).append((-free, position))
+        heapq.heapify(self._global_heap)
+        for heap in self._city_heaps.values():
+            heapq.heapify(heap)
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        lock: bool = False,
+        skip_locked: bool = False,
+        min_free: int | None = None,
+        city: str | None = None,
+    ) -> "CapacityTracker":
+        """Load AVAILABLE resources with their active_count in one query
+
+        lock=True row-locks the resources that still have free capacity
+        (SELECT ... FOR UPDATE) until the caller commits, so no other worker
+        can fill them meanwhile. With skip_locked=True resources locked by
+        another worker are left out instead of waited for, and min_free
+        stops claiming once that many free slots are held (most free
+        capacity first), leaving the other resources to parallel workers.
+        city restricts the load to one city's resources.
+        """
+        query = db.query(Resource).filter(Resource.status == "AVAILABLE")
+        if city is not None:
+            query = query.filter(Resource.city == city)
+        if not lock:
+            return cls.from_resources(query.all())
+
+        query = (
+            query.filter(Resource.active_count < Resource.capacity)
+            .with_for_update(skip_locked=skip_locked)
+            .populate_existing()
+        )
+        if not skip_locked:
+            # Blocking lockers take rows in one order to avoid deadlocks
+            return cls.from_resources(query.order_by(Resource.resource_id).all())
+        if min_free is None:
+            return cls.from_resources(query.all())
+
+        resources, free = [], 0
+        while free < min_free:
+            claimed = (
+                query.filter(
+                    Resource.resource_id.notin_([r.resource_id for r in resources])
+                )
+                .order_by((Resource.capacity - Resource.active_count).desc())
+                .limit(RESOURCE_CLAIM_BATCH)
+                .all()
+            )
+            if not claimed:
+                break
+            resources.extend(claimed)
+            free += sum(r.capacity - r.active_count for r in claimed)
+        return cls.from_resources(resources)
+
+    @classmethod
+    def from_resources(cls, resources: list[Resource]) -> "CapacityTracker":
+        counts = {resource.resource_id: resource.active_count or 0 for resource in resources}
+        return cls(resources, counts)
+
+    def free(self, position: int) -> int:
+        _, resource_id, capacity, _ = self.slots[position]
+        return capacity - self.active_counts[resource_id]
+
+    def _top(self, heap: list) -> tuple[int, int] | None:
+        """(free, position) of the best live heap entry"""
+        while heap:
+            negative_free, position = heap[0]
+            if -negative_free == self.free(position):
+                return -negative_free, position
+            heapq.heappop(heap)
+        return None
+
+    def best_for(self, city: str | None) -> tuple[Resource | None, int]:
+        """Best resource for a requester city and its score
+
+        Score is free capacity plus SAME_CITY_BONUS for a city match; ties
+        keep the first resource in load order.
+        """
+        best = self._top(self._global_heap)
+        if best is None:
+            return None, -1
+        best_score, best_position = best
+
+        city_heap = self._city_heaps.get(city) if city else None
+        city_best = self._top(city_heap) if city_heap else None
+        if city_best is not None:
+            city_free, city_position = city_best
+            city_score = city_free + SAME_CITY_BONUS
+            if (city_score, -city_position) > (best_score, -best_position):
+                best_score, best_position = city_score, city_position
+
+        return self.slots[best_position][0], best_score
+
+    def total_free(self) -> int:
+        return sum(max(self.free(position), 0) for position in range(len(self.slots)))
+
+    def free_by_city(self) -> dict[str, int]:
+        """Total free capacity per city"""
+        totals: dict[str, int] = {}
+        for position, (_, _, _, city) in enumerate(self.slots):
+            free = self.free(position)
+            if free > 0:
+                totals[city] = totals.get(city, 0) + free
+        return totals
+
+    def best_in_city(self, city: str | None) -> Resource | None:
+        """Resource with the most free capacity in a city"""
+        city_heap = self._city_heaps.get(city) if city else None
+        city_best = self._top(city_heap) if city_heap else None
+        return self.slots[city_best[1]][0] if city_best else None
+
+    def exclude(self, resource_id: str):
+        """Treat a resource as full from now on"""
+        _, _, capacity, _ = self.slots[self._position[resource_id]]
+        self.active_counts[resource_id] = max(self.active_counts[resource_id], capacity)
+
+    def assign(self, resource_id: str):
+        """Record a new ASSIGNED allocation on a resource"""
+        self.active_counts[resource_id] += 1
+
+        position = self._position[resource_id]
+        free = self.free(position)
+        if free > 0:
+            city = self.slots[position][3]
+            heapq.heappush(self._global_heap, (-free, position))
+            heapq.heappush(self._city_heaps[city], (-free, position))
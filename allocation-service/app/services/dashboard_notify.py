@@ -0,0 +1,18 @@
+"""Wake the backend's live dashboard feed (backend/app/services/live_feed.py).
+
+Writes that change the dashboard call notify_dashboard() inside their
+transaction. PostgreSQL delivers the notification when the transaction
+commits, never for a rollback. It also folds identical notifications in
+one transaction, so a batch allocation wakes the feed once. Other
+databases have no NOTIFY, and the feed polls them instead.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DASHBOARD_CHANNEL = "dashboard_feed"
+
+
+def notify_dashboard(db: Session) -> None:
+    """Queue a dashboard notification for the current transaction (no commit)"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": DASHBOARD_CHANNEL})
@@ -0,0 +1,36 @@
+"""Drift repair shared by the denormalised counters.
+
+Resource.active_count (services/active_counts.py) and request_rollups
+(services/request_rollups.py) are reconciled the same way. One statement
+reads the stored and the actual counts, so both come from the same
+snapshot. Each drifted counter is then corrected by actual - stored
+through the counter's own relative adjust function. A transaction that
+commits after the snapshot applies its own delta; an absolute write
+would overwrite it, the relative fix keeps it.
+"""
+from typing import Callable, Hashable
+from sqlalchemy.orm import Session
+from logging_config import allocation_logger
+
+Drift = dict[Hashable, tuple[int, int]]  # key -> (stored, actual)
+
+
+def repair_drift(
+    db: Session,
+    drift: Drift,
+    adjust: Callable[[Session, dict], None],
+    counter: str,
+    unit: str,
+    describe: Callable[[Hashable], str] = str,
+) -> None:
+    """Apply actual - stored for every drifted key and commit; roll back if none"""
+    if not drift:
+        db.rollback()
+        allocation_logger.debug(f"{counter} reconciliation: no drift")
+        return
+    adjust(db, {key: actual - stored for key, (stored, actual) in drift.items()})
+    db.commit()
+    allocation_logger.warning(
+        f"🔧 Reconciled {counter} on {len(drift)} {unit}",
+        extra={"extra_data": {"drift": {describe(k): list(v) for k, v in drift.items()}}},
+    )
@@ -0,0 +1,158 @@
+"""Compiled DerivedVariable formulas.
+
+Each formula (e.g. "( urgency_score * 2 ) + 10") is parsed once with `ast`
+into a closure tree. Only numeric constants, variable names, parentheses
+and the arithmetic operators + - * / // % ** are accepted; anything else
+(calls, attributes, comparisons, subscripts...) is rejected at compile
+time. Variables are evaluated in dependency order, and because the
+closures only apply arithmetic operators they work on NumPy arrays as
+well, so many inputs are evaluated in one pass.
+
+Variable names are case-insensitive ("Risk_Skoru" and "risk_skoru" are the
+same variable). The inputs are:
+
+- urgency_score: summed weight of the active `urgency == '<value>'` rules
+  for the request's urgency, i.e. the rule engine's own table (0 when no
+  rule matches), so formulas and rules never disagree about urgency.
+- waiting_hours: hours since the request was created. Variables reading
+  it, directly or through another variable, change over time.
+"""
+import ast
+import operator
+from graphlib import CycleError, TopologicalSorter
+import numpy as np
+from sqlalchemy.orm import Session
+from models import DerivedVariable
+from logging_config import allocation_logger
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    # Float power: huge exponents overflow (a FormulaError, see evaluate)
+    # instead of building arbitrarily large integers
+    ast.Pow: lambda base, exponent: np.power(np.asarray(base, dtype=np.float64), exponent),
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Request-derived inputs available to every formula
+BASE_VARIABLES = ("urgency_score", "waiting_hours")
+TIME_VARYING_VARIABLES = frozenset({"waiting_hours"})
+
+
+class FormulaError(ValueError):
+    """A formula is not valid arithmetic, its variables cannot be resolved,
+    or evaluating it divided by zero / overflowed"""
+
+
+class CompiledFormula:
+    def __init__(self, name: str, formula: str):
+        self.name = name.lower()
+        self.formula = formula
+        try:
+            tree = ast.parse(formula, mode="eval")
+        except SyntaxError as e:
+            raise FormulaError(f"{name}: invalid formula {formula!r}: {e.msg}")
+        self.dependencies: set[str] = set()
+        self._evaluate = self._compile(tree.body)
+
+    def _compile(self, node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = node.value
+            return lambda env: value
+        if isinstance(node, ast.Name):
+            name = node.id.lower()
+            self.dependencies.add(name)
+            return lambda env: env[name]
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            op = _BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda env: op(left(env), right(env))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            op = _UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand)
+            return lambda env: op(operand(env))
+        raise FormulaError(
+            f"{self.name}: {type(node).__name__} is not allowed in {self.formula!r}"
+        )
+
+    def __call__(self, env: dict):
+        return self._evaluate(env)
+
+
+class FormulaSet:
+    """Derived variables compiled and ordered by their dependencies"""
+
+    def __init__(self, variables: dict[str, str]):
+        self.version = tuple(sorted((name.lower(), f) for name, f in variables.items()))
+        self.formulas = {name: CompiledFormula(name, formula) for name, formula in self.version}
+
+        self.known = set(self.formulas) | set(BASE_VARIABLES)
+        graph = {}
+        for name, formula in self.formulas.items():
+            unknown = formula.dependencies - self.known
+            if unknown:
+                raise FormulaError(f"{name}: unknown variables {sorted(unknown)}")
+            graph[name] = formula.dependencies & set(self.formulas)
+
+        try:
+            self.order = list(TopologicalSorter(graph).static_order())
+        except CycleError as e:
+            raise FormulaError(f"Circular derived variables: {e.args[1]}")
+
+        # Dependencies come first in self.order, so one pass is transitive
+        self.time_varying: set[str] = set()
+        for name in self.order:
+            if self.formulas[name].dependencies & (TIME_VARYING_VARIABLES | self.time_varying):
+                self.time_varying.add(name)
+
+    def is_time_varying(self, name: str) -> bool:
+        return name.lower() in self.time_varying
+
+    def requirements(self, name: str) -> set[str]:
+        """The derived variables evaluating `name` needs, itself included"""
+        needed, pending = set(), [name.lower()]
+        while pending:
+            current = pending.pop()
+            if current in self.formulas and current not in needed:
+                needed.add(current)
+                pending.extend(self.formulas[current].dependencies)
+        return needed
+
+    def evaluate(self, env: dict, names=None) -> dict:
+        """Add derived variables to `env` (scalars or NumPy arrays)
+
+        names limits evaluation to those variables, which must include their
+        own dependencies (e.g. every time-invariant variable). Division by
+        zero and overflow raise FormulaError for scalars and arrays alike.
+        """
+        values = dict(env)
+        wanted = self.order if names is None else [n for n in self.order if n in names]
+        for name in wanted:
+            try:
+                with np.errstate(divide="raise", over="raise", invalid="raise"):
+                    values[name] = self.formulas[name](values)
+            except (ZeroDivisionError, OverflowError, FloatingPointError) as e:
+                raise FormulaError(f"{name}: {e} in {self.formulas[name].formula!r}")
+        return values
+
+
+_compiled_cache: dict[tuple, FormulaSet] = {}
+
+
+def load_formula_set(db: Session) -> FormulaSet:
+    """Compile the stored DerivedVariable formulas (cached per definition set)"""
+    variables = db.query(DerivedVariable).order_by(DerivedVariable.variable_id).all()
+    version = tuple((v.name, v.formula) for v in variables)
+    cached = _compiled_cache.get(version)
+    if cached is None:
+        _compiled_cache.clear()
+        cached = _compiled_cache[version] = FormulaSet(dict(version))
+        allocation_logger.info(f"🧮 Compiled {len(variables)} derived variables")
+    return cached
@@ -0,0 +1,150 @@
+"""Prefixed, time-ordered primary key generation.
+
+IDs keep their entity prefix (AL-, REQ-) and are generated by a pluggable
+generator, chosen with ID_GENERATOR:
+
+ulid (default)
+    AL-01JAB3K8Z6Q4W0S5G7T1V9XN2C: 48-bit millisecond timestamp plus 80
+    random bits in Crockford base32 (26 chars). IDs created in the same
+    millisecond increment the random part, so they stay strictly ordered
+    within a process. No coordination and no database round trip.
+
+sequence
+    AL-000000001001: numbers from a PostgreSQL sequence that advances in
+    blocks of ID_BLOCK_SIZE (see models.ID_SEQUENCES); each process hands
+    out a whole block before fetching the next one.
+
+Both keep B-tree inserts append-mostly, unlike random six-hex-digit IDs
+that also collide after a few thousand rows.
+"""
+import base64
+import os
+import secrets
+import threading
+import time
+from sqlalchemy import text
+from database import engine
+from models import ID_BLOCK_SIZE, ID_SEQUENCES
+
+ID_GENERATOR = os.getenv("ID_GENERATOR", "ulid")
+
+_RANDOM_BITS = 80
+_RANDOM_LIMIT = 1 << _RANDOM_BITS
+# RFC 4648 base32 alphabet -> Crockford base32 (ULID alphabet)
+_CROCKFORD = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", b"0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+)
+
+
+def encode_ulid(value: int) -> str:
+    """26-char Crockford base32 of a 128-bit value
+
+    Right-aligned in 20 bytes, the value starts exactly at the 7th base32
+    character, so the C base32 encoder does the work.
+    """
+    return base64.b32encode(value.to_bytes(20, "big"))[6:].translate(_CROCKFORD).decode()
+
+
+class UlidGenerator:
+    """Monotonic ULIDs (no database access)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _next_block(self, count: int) -> tuple[int, int]:
+        """(timestamp ms, first random part) of `count` consecutive ULIDs"""
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Leave room to increment without overflowing the random part
+                self._last_random = secrets.randbits(_RANDOM_BITS - 1)
+            if self._last_random + count >= _RANDOM_LIMIT:
+                # Practically unreachable; borrow the next millisecond
+                self._last_ms += 1
+                self._last_random = secrets.randbits(_RANDOM_BITS - 1)
+            start = self._last_random + 1
+            self._last_random += count
+            return self._last_ms, start
+
+    def new_id(self, prefix: str) -> str:
+        timestamp_ms, random_part = self._next_block(1)
+        return f"{prefix}-{encode_ulid(timestamp_ms << _RANDOM_BITS | random_part)}"
+
+    def new_ids(self, prefix: str, count: int) -> list[str]:
+        if count <= 0:
+            return []
+        timestamp_ms, start = self._next_block(count)
+        # Shared 10-char time part; the 80-bit random parts are exactly 16
+        # base32 chars each, so all of them are encoded in one call
+        head = f"{prefix}-{encode_ulid(timestamp_ms << _RANDOM_BITS)[:10]}"
+        tails = (
+            base64.b32encode(
+                b"".join(value.to_bytes(10, "big") for value in range(start, start + count))
+            )
+            .translate(_CROCKFORD)
+            .decode()
+        )
+        return [head + tails[offset : offset + 16] for offset in range(0, count * 16, 16)]
+
+
+class SequenceBlockGenerator:
+    """Numbers from PostgreSQL sequences, fetched one block at a time"""
+
+    def __init__(self, bind=engine, block_size: int = ID_BLOCK_SIZE):
+        self.bind = bind
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks: dict[str, tuple[int, int]] = {}  # prefix -> (next, end)
+
+    def _fetch_block(self, prefix: str) -> int:
+        # Own short transaction: a block is never handed out twice, even if
+        # the caller's transaction rolls back (gaps are fine)
+        with self.bind.begin() as connection:
+            return connection.execute(
+                text("SELECT nextval(:sequence)"), {"sequence": ID_SEQUENCES[prefix].name}
+            ).scalar()
+
+    def _next_values(self, prefix: str, count: int) -> list[int]:
+        values = []
+        with self._lock:
+            while len(values) < count:
+                next_value, end = self._blocks.get(prefix, (0, 0))
+                if next_value >= end:
+                    next_value = self._fetch_block(prefix)
+                    end = next_value + self.block_size
+                take = min(count - len(values), end - next_value)
+                values.extend(range(next_value, next_value + take))
+                self._blocks[prefix] = (next_value + take, end)
+        return values
+
+    def new_id(self, prefix: str) -> str:
+        return self.new_ids(prefix, 1)[0]
+
+    def new_ids(self, prefix: str, count: int) -> list[str]:
+        # Zero-padded so string order matches numeric order
+        return [f"{prefix}-{value:012d}" for value in self._next_values(prefix, count)]
+
+
+GENERATORS = {
+    "ulid": UlidGenerator,
+    "sequence": SequenceBlockGenerator,
+}
+
+if ID_GENERATOR not in GENERATORS:
+    raise ValueError(
+        f"Unknown ID_GENERATOR {ID_GENERATOR!r} (expected one of {', '.join(GENERATORS)})"
+    )
+id_generator = GENERATORS[ID_GENERATOR]()
+
+
+def new_id(prefix: str) -> str:
+    """One new ID, e.g. new_id("AL")"""
+    return id_generator.new_id(prefix)
+
+
+def new_ids(prefix: str, count: int) -> list[str]:
+    """`count` new IDs in ascending order (one lock / block fetch per batch)"""
+    return id_generator.new_ids(prefix, count)
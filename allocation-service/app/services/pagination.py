@@ -0,0 +1,72 @@
+"""Keyset (cursor) pagination for newest-first list endpoints.
+
+Pages are ordered by (timestamp column DESC, primary key DESC) and the
+next page starts strictly after the last row of the previous one:
+
+    WHERE (created_at, request_id) < (:last_created_at, :last_request_id)
+    ORDER BY created_at DESC, request_id DESC
+    LIMIT :limit + 1
+
+so every page is an index range scan of `limit` rows, however deep it is
+(no OFFSET). The cursor is an opaque base64 token of the last row's sort
+key; the response body stays a plain list and the cursor of the next page
+is returned in the X-Next-Cursor header (absent on the last page).
+
+The timestamp columns are nullable. NULLs sort first (PostgreSQL's
+default for DESC, which the indexes use; explicit so SQLite agrees) and
+are encoded as JSON null in the cursor. A row comparison never matches
+NULLs, so a NULL cursor pages through the remaining NULL rows by key and
+then on to every dated row.
+"""
+import base64
+import json
+from datetime import datetime
+from fastapi import Response
+from sqlalchemy import and_, or_, tuple_
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime | None, key: str) -> str:
+    stamp = sort_value.isoformat() if sort_value is not None else None
+    payload = json.dumps([stamp, key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, str]:
+    """(sort value or None, key) of a cursor; ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, key = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is None:
+            return None, str(key)
+        return datetime.fromisoformat(sort_value), str(key)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def paginate(query, sort_column, key_column, limit: int, cursor: str = None):
+    """Newest-first page of a Query or Select, one extra row to detect more"""
+    if cursor:
+        sort_value, key = decode_cursor(cursor)
+        if sort_value is None:
+            after = or_(and_(sort_column.is_(None), key_column < key), sort_column.isnot(None))
+        else:
+            after = tuple_(sort_column, key_column) < tuple_(sort_value, key)
+        query = query.where(after)
+    order = (sort_column.desc().nulls_first(), key_column.desc())
+    return query.order_by(*order).limit(limit + 1)
+
+
+def page_rows(rows: list, limit: int, sort_column, key_column, response: Response) -> list:
+    """Trim the extra row and set the next-page cursor header"""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        getattr(last, sort_column.key), getattr(last, key_column.key)
+    )
+    return rows
@@ -0,0 +1,329 @@
+"""Process-level priority queue of PENDING requests.
+
+Fed by POST /requests, drained by batch allocation and rebuilt from the
+database on startup. Entries are ordered with the time-invariant keys from
+services.priority: an uncapped tier keyed by `base - 2 * created_at_hours`
+and a capped tier keyed by `base + 20`, with requests promoted between
+them as they reach the cap. Taking the top K requests costs O(K log N).
+
+The queue belongs to one process, and the database stays the source of
+truth. Requests can be created, assigned or re-opened by other replicas.
+Every greedy batch first calls reconcile_new(), which loads the PENDING
+requests created since a created_at high-water mark (a range scan that
+grows with the new requests, not with the backlog). The periodic
+background job calls reconcile(), which compares the whole queue against
+the PENDING ids: it catches re-opened requests and drops requests assigned
+elsewhere (claiming skips those meanwhile, see allocate_batch).
+"""
+import heapq
+import itertools
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session, selectinload
+from models import Request
+from logging_config import allocation_logger
+from services.rule_engine import CompiledRuleSet
+from services.rule_cache import rule_cache
+from services.priority import (
+    capped_priority,
+    cap_reached_at,
+    ordering_key,
+    priority_from_key,
+    waiting_bonus,
+)
+
+# Request ids per IN (...) lookup when loading missing requests
+READ_CHUNK_SIZE = 1000
+
+# reconcile_new() re-reads this far behind the high-water mark, so requests
+# whose transaction committed late (or whose replica clock lags) are found
+RECONCILE_LOOKBACK_SECONDS = int(os.getenv("PENDING_QUEUE_LOOKBACK_SECONDS", "60"))
+
+UNCAPPED = "uncapped"
+CAPPED = "capped"
+
+
+@dataclass(eq=False)
+class QueuedRequest:
+    """Snapshot of the request fields the rule engine and allocator read"""
+
+    request_id: str
+    urgency: str
+    service_id: str
+    request_type_id: str
+    created_at: datetime | None
+    city: str | None
+    base: float = 0.0
+    tier: str = UNCAPPED
+
+    @classmethod
+    def from_request(cls, request: Request, city: str | None) -> "QueuedRequest":
+        return cls(
+            request_id=request.request_id,
+            urgency=request.urgency,
+            service_id=request.service_id,
+            request_type_id=request.request_type_id,
+            created_at=request.created_at,
+            city=city,
+        )
+
+    def priority(self, as_of: datetime) -> float:
+        return self.base + waiting_bonus(self.created_at, as_of)
+
+
+class PendingQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, QueuedRequest] = {}
+        self._uncapped: list = []  # (-key, seq, entry)
+        self._capped: list = []  # (-(base + cap), seq, entry)
+        self._promotions: list = []  # (cap reached at, seq, entry)
+        self._seq = itertools.count()
+        self.rule_set: CompiledRuleSet | None = None
+        self.ready = False
+        # Newest created_at seen in the database (None: scan everything)
+        self._watermark: datetime | None = None
+        # Requests pushed while rebuild() reads the database (None otherwise)
+        self._pushed_during_rebuild: dict[str, QueuedRequest] | None = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---- internal (lock held) ----
+
+    def _place(self, entry: QueuedRequest, as_of: datetime):
+        seq = next(self._seq)
+        entry.base = self.rule_set.base_score(entry)
+        if not entry.created_at:
+            # No waiting bonus ever applies: constant priority
+            entry.tier = CAPPED
+            heapq.heappush(self._capped, (-entry.base, seq, entry))
+        elif cap_reached_at(entry.created_at) <= as_of:
+            entry.tier = CAPPED
+            heapq.heappush(self._capped, (-capped_priority(entry.base), seq, entry))
+        else:
+            entry.tier = UNCAPPED
+            key = ordering_key(entry.base, entry.created_at)
+            heapq.heappush(self._uncapped, (-key, seq, entry))
+            heapq.heappush(
+                self._promotions, (cap_reached_at(entry.created_at), seq, entry)
+            )
+        self._entries[entry.request_id] = entry
+
+    def _advance_watermark(self, created_at):
+        newest = max((c for c in created_at if c is not None), default=None)
+        if newest is not None and (self._watermark is None or newest > self._watermark):
+            self._watermark = newest
+
+    def _live(self, entry: QueuedRequest, tier: str) -> bool:
+        return self._entries.get(entry.request_id) is entry and entry.tier == tier
+
+    def _promote(self, as_of: datetime):
+        while self._promotions and self._promotions[0][0] <= as_of:
+            _, seq, entry = heapq.heappop(self._promotions)
+            if self._live(entry, UNCAPPED):
+                entry.tier = CAPPED
+                heapq.heappush(
+                    self._capped, (-capped_priority(entry.base), seq, entry)
+                )
+
+    def _top(self, heap: list, tier: str):
+        while heap and not self._live(heap[0][2], tier):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    # ---- public API ----
+
+    @staticmethod
+    def _read(db: Session, request_ids: list[str] | None = None) -> list[QueuedRequest]:
+        """Snapshots of PENDING requests (all, or just `request_ids`)"""
+        query = (
+            db.query(Request)
+            .options(selectinload(Request.user))
+            .filter(Request.status == "PENDING")
+        )
+        if request_ids is None:
+            chunks = [query]
+        else:
+            chunks = [
+                query.filter(
+                    Request.request_id.in_(request_ids[offset : offset + READ_CHUNK_SIZE])
+                )
+                for offset in range(0, len(request_ids), READ_CHUNK_SIZE)
+            ]
+        return [
+            QueuedRequest.from_request(req, req.user.city if req.user else None)
+            for chunk in chunks
+            for req in chunk
+        ]
+
+    def rebuild(self, db: Session):
+        """Reload every PENDING request and the active rules from the database"""
+        with self._lock:
+            self._pushed_during_rebuild = {}
+        try:
+            rule_set = rule_cache.get(db)
+            entries = {entry.request_id: entry for entry in self._read(db)}
+        finally:
+            with self._lock:
+                pushed, self._pushed_during_rebuild = self._pushed_during_rebuild, None
+        # The read may predate requests pushed meanwhile; keep those too
+        entries.update(pushed)
+
+        with self._lock:
+            self.rule_set = rule_set
+            self._load(list(entries.values()))
+            self._advance_watermark(entry.created_at for entry in entries.values())
+            self.ready = True
+
+        allocation_logger.info(f"📥 Pending queue rebuilt: {len(entries)} requests")
+
+    def reconcile_new(self, db: Session):
+        """Queue PENDING requests created since the high-water mark
+
+        Cheap enough to run before every greedy batch. Rows older than the
+        look-back window are left to reconcile().
+        """
+        with self._lock:
+            watermark = self._watermark
+        query = db.query(Request.request_id, Request.created_at).filter(
+            Request.status == "PENDING"
+        )
+        if watermark is not None:
+            since = watermark - timedelta(seconds=RECONCILE_LOOKBACK_SECONDS)
+            query = query.filter(Request.created_at >= since)
+        rows = query.all()
+
+        with self._lock:
+            missing = {request_id for request_id, _ in rows} - self._entries.keys()
+        entries = self._read(db, sorted(missing)) if missing else []
+
+        with self._lock:
+            self._advance_watermark(created_at for _, created_at in rows)
+            as_of = datetime.utcnow()
+            for entry in entries:
+                if entry.request_id not in self._entries:
+                    self._place(entry, as_of)
+
+        if entries:
+            allocation_logger.info(f"🔃 Pending queue caught up: +{len(entries)} requests")
+
+    def reconcile(self, db: Session):
+        """Sync the queue with all PENDING requests in the database (full scan)
+
+        Only entries queued before the id scan can be dropped, so a request
+        pushed while it runs is never lost.
+        """
+        with self._lock:
+            queued = set(self._entries)
+        pending = {
+            request_id
+            for (request_id,) in db.query(Request.request_id).filter(
+                Request.status == "PENDING"
+            )
+        }
+        missing = pending - queued
+        entries = self._read(db, sorted(missing)) if missing else []
+        stale = queued - pending
+
+        with self._lock:
+            for request_id in stale:
+                self._entries.pop(request_id, None)
+            self._advance_watermark(entry.created_at for entry in entries)
+            as_of = datetime.utcnow()
+            for entry in entries:
+                if entry.request_id not in self._entries:
+                    self._place(entry, as_of)
+
+        if entries or stale:
+            allocation_logger.info(
+                f"🔃 Pending queue reconciled: +{len(entries)} / -{len(stale)} requests"
+            )
+
+    def _load(self, entries: list[QueuedRequest]):
+        self._entries = {}
+        self._uncapped, self._capped, self._promotions = [], [], []
+        as_of = datetime.utcnow()
+        for entry in entries:
+            self._place(entry, as_of)
+
+    def push(self, request: Request, city: str | None):
+        """Add a newly created PENDING request"""
+        if not self.ready and self._pushed_during_rebuild is None:
+            return
+        entry = QueuedRequest.from_request(request, city)
+        with self._lock:
+            if self._pushed_during_rebuild is not None:
+                self._pushed_during_rebuild[entry.request_id] = entry
+            if self.ready:
+                self._place(entry, datetime.utcnow())
+
+    def discard(self, request_ids):
+        """Forget requests that were allocated outside of pop()"""
+        with self._lock:
+            for request_id in request_ids:
+                self._entries.pop(request_id, None)
+
+    def restore(self, entries: list[QueuedRequest]):
+        """Put popped entries back (e.g. they could not be allocated)"""
+        with self._lock:
+            as_of = datetime.utcnow()
+            for entry in entries:
+                self._place(entry, as_of)
+
+    def rescore(self, rule_set: CompiledRuleSet):
+        """Apply a changed rule set to every queued request in place"""
+        with self._lock:
+            self.rule_set = rule_set
+            self._load(list(self._entries.values()))
+        allocation_logger.info(
+            f"🔁 Pending queue rescored: {len(self._entries)} requests, "
+            f"{len(rule_set)} rules"
+        )
+
+    def pop(self, limit: int, as_of: datetime) -> list[tuple]:
+        """Remove and return the top `limit` requests at `as_of`
+
+        Returns (entry, city, priority) tuples, highest priority first.
+        """
+        popped = []
+        with self._lock:
+            self._promote(as_of)
+            while len(popped) < limit:
+                uncapped = self._top(self._uncapped, UNCAPPED)
+                capped = self._top(self._capped, CAPPED)
+                if uncapped is None and capped is None:
+                    break
+
+                uncapped_priority = (
+                    priority_from_key(-uncapped[0], as_of) if uncapped else None
+                )
+                capped_score = -capped[0] if capped else None
+                if capped is None or (
+                    uncapped is not None
+                    and (uncapped_priority, -uncapped[1]) > (capped_score, -capped[1])
+                ):
+                    heap = self._uncapped
+                else:
+                    heap = self._capped
+
+                _, _, entry = heapq.heappop(heap)
+                del self._entries[entry.request_id]
+                popped.append((entry, entry.city, entry.priority(as_of)))
+        return popped
+
+    def stats(self) -> dict:
+        with self._lock:
+            capped = sum(1 for e in self._entries.values() if e.tier == CAPPED)
+            return {
+                "ready": self.ready,
+                "pending": len(self._entries),
+                "capped": capped,
+                "uncapped": len(self._entries) - capped,
+                "rules": len(self.rule_set) if self.rule_set else 0,
+            }
+
+
+pending_queue = PendingQueue()
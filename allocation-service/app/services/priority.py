@@ -0,0 +1,57 @@
+"""Waiting-time bonus and time-invariant priority ordering.
+
+priority(t) = base score + min(waiting hours * 2, 20)
+
+A batch fixes one as-of time and computes every bonus against it. For a
+request that has not reached the cap yet, priority(t) = key + 2 * t where
+
+    key = base score - 2 * created_at (in epoch hours)
+
+does not depend on t, so pending requests can stay ordered by key without
+being rescored as time passes. Once a request has waited CAP_HOURS its
+priority is the constant base score + 20 (the capped tier).
+"""
+from datetime import datetime, timedelta
+
+WAITING_POINTS_PER_HOUR = 2
+WAITING_BONUS_CAP = 20
+CAP_HOURS = WAITING_BONUS_CAP / WAITING_POINTS_PER_HOUR
+
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def epoch_us(moment: datetime) -> int:
+    """Exact integer microseconds since the epoch (naive UTC)"""
+    return (moment - EPOCH) // _MICROSECOND
+
+
+def epoch_hours(moment: datetime) -> float:
+    return epoch_us(moment) / 10**6 / 3600
+
+
+def waiting_bonus(created_at: datetime | None, as_of: datetime) -> float:
+    """2 points per waiting hour, capped at 20"""
+    if not created_at:
+        return 0.0
+    waiting_hours = (as_of - created_at).total_seconds() / 3600
+    return min(waiting_hours * WAITING_POINTS_PER_HOUR, WAITING_BONUS_CAP)
+
+
+def ordering_key(base_score: float, created_at: datetime) -> float:
+    """Time-invariant rank of an uncapped request (higher is better)"""
+    return base_score - WAITING_POINTS_PER_HOUR * epoch_hours(created_at)
+
+
+def priority_from_key(key: float, as_of: datetime) -> float:
+    """Priority at `as_of` of an uncapped request with the given key"""
+    return key + WAITING_POINTS_PER_HOUR * epoch_hours(as_of)
+
+
+def capped_priority(base_score: float) -> float:
+    return base_score + WAITING_BONUS_CAP
+
+
+def cap_reached_at(created_at: datetime) -> datetime:
+    """Moment a request moves into the capped tier"""
+    return created_at + timedelta(hours=CAP_HOURS)
@@ -0,0 +1,120 @@
+"""Incrementally maintained request counts per (status, urgency, service_id).
+
+request_rollups mirrors
+
+    SELECT status, urgency, service_id, count(*) FROM requests GROUP BY 1, 2, 3
+
+Every code path that creates a request or changes its status applies the
+matching deltas with an upsert (request_count = request_count + n) inside
+its own transaction; the caller commits. Dashboards read these few rows
+instead of scanning the requests table. Deltas are written in key order,
+so transactions touching several rollup rows lock them in the same order.
+Each change also notifies the live dashboard feed (services/dashboard_notify.py).
+
+reconcile_request_rollups() rebuilds the counts from the requests table,
+diffs them against the maintained rows and repairs any drift (see
+services/drift.py).
+"""
+from collections import Counter
+from typing import Iterable
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import Request, RequestRollup
+from services.dashboard_notify import notify_dashboard
+from services.drift import repair_drift
+
+RollupKey = tuple[str, str, str]  # (status, urgency, service_id)
+
+_rollups = RequestRollup.__table__
+
+_UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+_upsert_statements = {}
+
+
+def _upsert_statement(dialect_name: str):
+    """Executemany-friendly INSERT ... ON CONFLICT DO UPDATE adding the delta"""
+    if dialect_name not in _upsert_statements:
+        statement = _UPSERT_DIALECTS[dialect_name].insert(_rollups)
+        _upsert_statements[dialect_name] = statement.on_conflict_do_update(
+            index_elements=[_rollups.c.status, _rollups.c.urgency, _rollups.c.service_id],
+            set_={"request_count": _rollups.c.request_count + statement.excluded.request_count},
+        )
+    return _upsert_statements[dialect_name]
+
+
+def adjust_request_rollups(db: Session, deltas: dict[RollupKey, int]) -> None:
+    """Add a signed delta to each rollup row, creating missing rows (no commit)"""
+    params = [
+        {"status": status, "urgency": urgency, "service_id": service_id, "request_count": delta}
+        for (status, urgency, service_id), delta in sorted(deltas.items())
+        if delta
+    ]
+    if params:
+        db.execute(_upsert_statement(db.get_bind().dialect.name), params)
+        notify_dashboard(db)
+
+
+def record_created(db: Session, urgency: str, service_id: str, status: str = "PENDING"):
+    """Count one new request (no commit)"""
+    adjust_request_rollups(db, {(status, urgency, service_id): 1})
+
+
+def record_transition(
+    db: Session, groups: Iterable[tuple[str, str]], from_status: str, to_status: str
+) -> None:
+    """Move requests, given as (urgency, service_id) pairs, between statuses (no commit)"""
+    deltas: Counter = Counter()
+    for (urgency, service_id), count in Counter(groups).items():
+        deltas[(from_status, urgency, service_id)] -= count
+        deltas[(to_status, urgency, service_id)] += count
+    adjust_request_rollups(db, deltas)
+
+
+def reconcile_request_rollups(
+    db: Session, repair: bool = True
+) -> dict[RollupKey, tuple[int, int]]:
+    """Rebuild the rollups from the requests table and fix drift
+
+    Returns {(status, urgency, service_id): (stored, actual)} for every
+    row that differs; with repair=False the drift is only reported.
+    """
+    actual = (
+        select(
+            Request.status,
+            Request.urgency,
+            Request.service_id,
+            func.count(Request.request_id).label("request_count"),
+        )
+        .group_by(Request.status, Request.urgency, Request.service_id)
+        .subquery()
+    )
+    # FULL JOIN, so stored and actual are read by one statement
+    rows = db.execute(
+        select(
+            func.coalesce(_rollups.c.status, actual.c.status),
+            func.coalesce(_rollups.c.urgency, actual.c.urgency),
+            func.coalesce(_rollups.c.service_id, actual.c.service_id),
+            func.coalesce(_rollups.c.request_count, 0),
+            func.coalesce(actual.c.request_count, 0),
+        ).select_from(
+            _rollups.join(
+                actual,
+                (_rollups.c.status == actual.c.status)
+                & (_rollups.c.urgency == actual.c.urgency)
+                & (_rollups.c.service_id == actual.c.service_id),
+                full=True,
+            )
+        )
+    ).all()
+
+    drift = {
+        (status, urgency, service_id): (stored, real)
+        for status, urgency, service_id, stored, real in rows
+        if stored != real
+    }
+    if repair:
+        repair_drift(db, drift, adjust_request_rollups, "request rollups", "groups", "/".join)
+    else:
+        db.rollback()
+    return drift
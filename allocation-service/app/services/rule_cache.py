@@ -0,0 +1,94 @@
+"""Process-level cache of the compiled active rule set.
+
+The cache is keyed by the monotonic version stored in the single
+`rule_set_versions` row. Each lookup reads only that row by primary key;
+the allocation_rules table is queried again only when the version moved,
+i.e. when any worker process changed the rules through bump_version().
+
+Rule conditions may read derived variables, so every writer of
+allocation_rules or derived_variables must bump the version in the same
+transaction: PUT /rules, the backend seed loader, and manual SQL
+(`UPDATE rule_set_versions SET version = version + 1`). Migration 0006
+creates the row.
+"""
+import threading
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import AllocationRule, RuleSetVersion
+from logging_config import allocation_logger
+from services.formulas import FormulaError, load_formula_set
+from services.rule_engine import CompiledRuleSet, compile_rules
+
+VERSION_ROW_ID = 1
+
+_versions = RuleSetVersion.__table__
+_UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+
+
+def bump_rule_set_version(db: Session) -> None:
+    """Atomically increment the version, creating the row if missing (no commit)"""
+    statement = _UPSERT_DIALECTS[db.get_bind().dialect.name].insert(_versions)
+    db.execute(
+        statement.values(id=VERSION_ROW_ID, version=1, updated_at=datetime.utcnow())
+        .on_conflict_do_update(
+            index_elements=[_versions.c.id],
+            set_={
+                "version": _versions.c.version + 1,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
+class RuleCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._rule_set: CompiledRuleSet | None = None
+
+    @staticmethod
+    def current_version(db: Session) -> int:
+        version = (
+            db.query(RuleSetVersion.version)
+            .filter(RuleSetVersion.id == VERSION_ROW_ID)
+            .scalar()
+        )
+        return version or 0
+
+    def get(self, db: Session) -> CompiledRuleSet:
+        """Compiled active rules, reloaded only when the version changed"""
+        version = self.current_version(db)
+        with self._lock:
+            if self._rule_set is not None and self._version == version:
+                return self._rule_set
+
+        rules = db.query(AllocationRule).filter(AllocationRule.is_active == True).all()
+        try:
+            formulas = load_formula_set(db)
+        except FormulaError as e:
+            # A broken formula only disables the rules that compare derived
+            # variables; plain attribute rules keep scoring
+            allocation_logger.error(f"❌ Derived variables ignored: {e}")
+            formulas = None
+        rule_set = compile_rules(rules, formulas)
+
+        with self._lock:
+            self._version, self._rule_set = version, rule_set
+        allocation_logger.info(f"📚 Rule set loaded (version {version})")
+        return rule_set
+
+    def invalidate(self):
+        with self._lock:
+            self._version, self._rule_set = None, None
+
+    def bump_version(self, db: Session):
+        """Increment the shared version in the caller's transaction
+
+        Must be called in the same transaction that changes allocation rules.
+        """
+        bump_rule_set_version(db)
+        self.invalidate()
+
+
+rule_cache = RuleCache()
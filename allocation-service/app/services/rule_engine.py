@@ -0,0 +1,289 @@
+"""Compiled rule engine for allocation priority scoring.
+
+AllocationRule.condition strings are parsed once per rule-set version into
+CompiledRule predicates and indexed by (column, value). Scoring a request
+afterwards is one lookup per referenced request column.
+
+Conditions may also compare a derived variable (services.formulas) with a
+number, e.g. `risk_skoru > 40`. Only time-invariant variables are
+supported: they depend on the request's urgency alone, so each such rule is
+evaluated once per urgency value at compile time and folded into the
+urgency index. Scores therefore stay constant while a request waits, which
+the pending queue's ordering keys rely on. Rules on variables that read
+waiting_hours are skipped like any other unsupported condition.
+"""
+import operator
+import re
+from dataclasses import dataclass
+import numpy as np
+from models import AllocationRule
+from logging_config import allocation_logger
+from services.formulas import FormulaError, FormulaSet
+
+# Condition attribute -> Request column it is matched against
+RULE_ATTRIBUTES = {
+    "urgency": "urgency",
+    "service": "service_id",
+    "request_type": "request_type_id",
+}
+
+# Column whose rule weights make up the urgency_score formula input
+URGENCY_COLUMN = RULE_ATTRIBUTES["urgency"]
+
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+_DERIVED_CONDITION = re.compile(
+    r"^\s*([A-Za-z_]\w*)\s*(==|!=|>=|<=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$"
+)
+
+# Compiled rule sets kept per version (active rules change rarely)
+_MAX_CACHED_VERSIONS = 8
+_compiled_cache: dict[tuple, "CompiledRuleSet"] = {}
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Pre-parsed `<attribute> == '<value>'` condition"""
+
+    rule_id: str
+    column: str
+    value: str
+    weight: int
+
+
+@dataclass(frozen=True)
+class DerivedRule:
+    """Pre-parsed `<derived variable> <op> <number>` condition"""
+
+    rule_id: str
+    variable: str
+    op: str
+    threshold: float
+    weight: int
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """Summed effect of every rule matching one (column, value) pair"""
+
+    weight: int
+    rule_ids: tuple[str, ...]
+    label: str
+
+
+class CompiledRuleSet:
+    """Active rules compiled into an attribute index, identified by a version key
+
+    Rules are plain equality tests, so they are grouped by (column, value).
+    Derived-variable rules are folded into the urgency column: into the
+    entry of each urgency value they match, and into `defaults` for urgency
+    values no equality rule names. Scoring a request costs one dict lookup
+    per referenced column, no matter how many rules the admins have defined.
+    """
+
+    def __init__(
+        self,
+        version,
+        rules: list[CompiledRule],
+        derived_rules: list[DerivedRule] = (),
+        formulas: FormulaSet | None = None,
+    ):
+        self.version = version
+        self.rules = rules
+        self.derived_rules = list(derived_rules)
+        self.index: dict[str, dict[str, RuleMatch]] = {}
+        self.defaults: dict[str, RuleMatch] = {}
+
+        grouped: dict[str, dict[str, list[CompiledRule]]] = {}
+        for rule in rules:
+            grouped.setdefault(rule.column, {}).setdefault(rule.value, []).append(rule)
+        default_rules = self._fold_derived(grouped, formulas) if self.derived_rules else []
+
+        for column, by_value in grouped.items():
+            self.index[column] = {
+                value: self._summarize(matched) for value, matched in by_value.items()
+            }
+        if default_rules:
+            self.defaults[URGENCY_COLUMN] = self._summarize(default_rules)
+
+        self.lookups = tuple(
+            (column, self.index.get(column, {}), self.defaults.get(column))
+            for column in self.index.keys() | self.defaults.keys()
+        )
+
+    @staticmethod
+    def _summarize(matched: list[CompiledRule]) -> RuleMatch:
+        return RuleMatch(
+            weight=sum(rule.weight for rule in matched),
+            rule_ids=tuple(rule.rule_id for rule in matched),
+            label=", ".join(f"{rule.rule_id}(+{rule.weight})" for rule in matched),
+        )
+
+    def _fold_derived(self, grouped, formulas: FormulaSet) -> list[CompiledRule]:
+        """Add derived rules to the urgency groups; return the default group
+
+        urgency_score is evaluated for every urgency value named by a rule,
+        plus 0 for all other values, in one array pass per derived rule.
+        """
+        by_urgency = grouped.setdefault(URGENCY_COLUMN, {})
+        values = list(by_urgency)
+        urgency_score = np.array(
+            [sum(rule.weight for rule in by_urgency[value]) for value in values] + [0],
+            dtype=np.float64,
+        )
+        default_rules = []
+        kept = []
+        for rule in self.derived_rules:
+            try:
+                evaluated = formulas.evaluate(
+                    {"urgency_score": urgency_score}, formulas.requirements(rule.variable)
+                )
+            except FormulaError as e:
+                allocation_logger.warning(f"Rule {rule.rule_id} skipped: {e}")
+                continue
+            kept.append(rule)
+            matched = np.broadcast_to(
+                _COMPARISONS[rule.op](evaluated[rule.variable], rule.threshold),
+                urgency_score.shape,
+            )
+            for position in np.flatnonzero(matched):
+                if position < len(values):
+                    value = values[position]
+                    by_urgency[value].append(
+                        CompiledRule(rule.rule_id, URGENCY_COLUMN, value, rule.weight)
+                    )
+                else:
+                    default_rules.append(
+                        CompiledRule(rule.rule_id, URGENCY_COLUMN, None, rule.weight)
+                    )
+        if not by_urgency:
+            del grouped[URGENCY_COLUMN]
+        self.derived_rules = kept
+        return default_rules
+
+    def __len__(self):
+        return len(self.rules) + len(self.derived_rules)
+
+    def match(self, request) -> list[RuleMatch]:
+        """Index entries matched by a request (at most one per column)"""
+        matches = []
+        for column, by_value, default in self.lookups:
+            entry = by_value.get(getattr(request, column), default)
+            if entry is not None:
+                matches.append(entry)
+        return matches
+
+    def base_score(self, request) -> float:
+        """Summed weight of matching rules"""
+        score = 0.0
+        for column, by_value, default in self.lookups:
+            entry = by_value.get(getattr(request, column), default)
+            if entry is not None:
+                score += entry.weight
+        return score
+
+    def score(self, request) -> tuple[float, list[str]]:
+        """Return (base score, matched rule labels) for a request"""
+        matches = self.match(request)
+        return float(sum(m.weight for m in matches)), [m.label for m in matches]
+
+
+def parse_condition(condition: str) -> tuple[str, str] | None:
+    """Parse a rule condition into (request column, expected value)
+
+    Only simple equality conditions are supported; anything else returns None.
+    """
+    for attribute, column in RULE_ATTRIBUTES.items():
+        if f"{attribute} ==" in condition:
+            value = condition.split("==")[1].strip().strip("'\"")
+            return column, value
+    return None
+
+
+def parse_derived_condition(
+    condition: str, formulas: FormulaSet | None
+) -> tuple[str, str, float] | None:
+    """Parse `<variable> <op> <number>` into (variable, op, threshold)
+
+    Returns None unless the variable is a formula input or derived variable.
+    """
+    found = _DERIVED_CONDITION.match(condition)
+    if found is None or formulas is None:
+        return None
+    variable, op, threshold = found.groups()
+    variable = variable.lower()
+    if variable not in formulas.known:
+        return None
+    return variable, op, float(threshold)
+
+
+def compile_rule(
+    rule: AllocationRule, formulas: FormulaSet | None = None
+) -> CompiledRule | DerivedRule | None:
+    derived = parse_derived_condition(rule.condition or "", formulas)
+    if derived is not None:
+        variable, op, threshold = derived
+        if formulas.is_time_varying(variable):
+            allocation_logger.debug(
+                f"Rule {rule.rule_id} skipped: {variable} changes with waiting time"
+            )
+            return None
+        return DerivedRule(rule.rule_id, variable, op, threshold, rule.weight)
+
+    parsed = parse_condition(rule.condition or "")
+    if parsed is None:
+        allocation_logger.debug(
+            f"Rule {rule.rule_id} skipped: unsupported condition {rule.condition!r}"
+        )
+        return None
+    column, value = parsed
+    return CompiledRule(rule.rule_id, column, value, rule.weight)
+
+
+def rule_set_version(rules: list[AllocationRule]) -> tuple:
+    """Version key derived from the rule definitions themselves"""
+    return tuple(
+        (rule.rule_id, rule.condition, rule.weight, bool(rule.is_active))
+        for rule in rules
+    )
+
+
+def compile_rules(rules, formulas: FormulaSet | None = None) -> CompiledRuleSet:
+    """Compile active rules, reusing the cached result for the same version
+
+    formulas supplies the derived variables rule conditions may compare.
+    Passing an already compiled rule set returns it unchanged.
+    """
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+
+    version = (rule_set_version(rules), formulas.version if formulas else ())
+    cached = _compiled_cache.get(version)
+    if cached is not None:
+        return cached
+
+    compiled, derived = [], []
+    for rule in rules:
+        if not rule.is_active:
+            continue
+        compiled_rule = compile_rule(rule, formulas)
+        if isinstance(compiled_rule, DerivedRule):
+            derived.append(compiled_rule)
+        elif compiled_rule:
+            compiled.append(compiled_rule)
+
+    if len(_compiled_cache) >= _MAX_CACHED_VERSIONS:
+        _compiled_cache.clear()
+    rule_set = CompiledRuleSet(version, compiled, derived, formulas)
+    _compiled_cache[version] = rule_set
+
+    allocation_logger.info(
+        f"🧩 Compiled {len(rule_set)}/{len(rules)} allocation rules"
+    )
+    return rule_set
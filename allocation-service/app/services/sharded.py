@@ -0,0 +1,189 @@
+"""City-sharded batch allocation over a process pool.
+
+Same-city matches earn SAME_CITY_BONUS, so the backlog partitions naturally
+by city. The calling process only counts the pending requests per city
+(one GROUP BY) and splits the cities into groups of similar backlog. Each
+worker opens its own session, loads and scores just its cities' requests
+(`city IN (...)`), then claims each city's resources and requests with the
+same row locks as allocate_pending_requests (FOR UPDATE SKIP LOCKED),
+assigns them locally and commits per city. Loading and scoring therefore
+run in parallel too, instead of serially in the caller.
+
+The process pool is opt-in. It runs only when ALLOCATION_SHARD_WORKERS
+is above 1, the machine has more than one core and the backlog holds at
+least ALLOCATION_SHARD_MIN_REQUESTS requests. Otherwise the calling
+process allocates the cities one after another, with the same result.
+The parallel speedup is unmeasured on multi-core hosts, so run
+benchmarks/bench_sharded.py there before raising the worker count.
+
+Requests left over when their city runs out of capacity are handled by a
+final global pass in the calling process, which may place them in other
+cities.
+
+Unlike a plain batch, local requesters get their city's capacity before
+higher-priority requesters from cities without free resources.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Allocation, Request, Resource, User
+from logging_config import allocation_logger
+from services.allocation import AllocationService
+from services.capacity import CapacityTracker
+from services.pending_queue import pending_queue
+from services.solver import assign_batch
+
+# Worker processes for sharded allocation, capped at the core count (1: serial)
+SHARD_WORKERS = int(os.getenv("ALLOCATION_SHARD_WORKERS", "1"))
+# Smallest backlog that is worth spawning and feeding the pool
+SHARD_MIN_REQUESTS = int(os.getenv("ALLOCATION_SHARD_MIN_REQUESTS", "20000"))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def shard_pool(workers: int = SHARD_WORKERS) -> ProcessPoolExecutor:
+    """Long-lived worker pool, created on first use
+
+    Workers are spawned, not forked: each opens its own database engine
+    instead of inheriting the parent's pooled connections.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def effective_workers(workers: int, backlog: int, cities: int, min_requests: int) -> int:
+    """Worker processes to use for a backlog; 1 means serial in the caller"""
+    if backlog < min_requests:
+        return 1
+    return max(1, min(workers, os.cpu_count() or 1, cities))
+
+
+def city_backlogs(db: Session) -> dict[str, int]:
+    """Pending request count per requester city, for cities with free capacity"""
+    with_capacity = (
+        db.query(Resource.city)
+        .filter(Resource.status == "AVAILABLE", Resource.active_count < Resource.capacity)
+        .distinct()
+    )
+    return dict(
+        db.query(User.city, func.count(Request.request_id))
+        .join(Request, Request.user_id == User.user_id)
+        .filter(Request.status == "PENDING", User.city.in_(with_capacity))
+        .group_by(User.city)
+        .all()
+    )
+
+
+def partition_cities(backlogs: dict[str, int], groups: int) -> list[list[str]]:
+    """Split cities into at most `groups` groups of similar total backlog
+
+    Biggest city first, each into the currently lightest group; cities keep
+    that order within their group.
+    """
+    partition = [[] for _ in range(groups)]
+    loads = [0] * groups
+    for city in sorted(backlogs, key=lambda city: (-backlogs[city], city)):
+        lightest = loads.index(min(loads))
+        partition[lightest].append(city)
+        loads[lightest] += backlogs[city]
+    return [cities for cities in partition if cities]
+
+
+def allocate_cities(cities: list[str], as_of: datetime, strategy: str = "greedy") -> list[dict]:
+    """Load, score and allocate the given cities' requests (worker side)
+
+    Each city is claimed and committed separately; a failing city is
+    logged and left to the caller's global pass. Candidates that another
+    worker claimed meanwhile are skipped. Returns the written allocation
+    rows.
+    """
+    db = SessionLocal()
+    try:
+        shards: dict[str, list[tuple]] = {}
+        for candidate in AllocationService.load_candidates(db, as_of, cities):
+            shards.setdefault(candidate[1], []).append(candidate)
+        db.rollback()
+
+        rows = []
+        for city in cities:
+            try:
+                capacity = CapacityTracker.load(db, lock=True, skip_locked=True, city=city)
+                claimed = AllocationService.claim_candidates(
+                    db, shards.get(city, []), capacity.total_free()
+                )
+                city_rows = AllocationService.allocation_rows(
+                    assign_batch(claimed, capacity, strategy)
+                )
+                AllocationService.write_allocations(city_rows, db)
+                db.rollback()  # release the locks when nothing was written
+            except Exception as e:
+                db.rollback()
+                allocation_logger.error(f"City shard {city} failed: {e}", exc_info=True)
+                continue
+            rows.extend(city_rows)
+            allocation_logger.debug(f"City shard {city}: {len(city_rows)} allocated")
+        return rows
+    finally:
+        db.close()
+
+
+def allocate_sharded(
+    db: Session,
+    strategy: str = "greedy",
+    workers: int = SHARD_WORKERS,
+    min_requests: int = SHARD_MIN_REQUESTS,
+) -> list[Allocation]:
+    """Allocate per city, in parallel when worthwhile, then a global pass for leftovers"""
+    as_of = datetime.utcnow()
+    backlogs = city_backlogs(db)
+    db.rollback()
+    backlog = sum(backlogs.values())
+    workers = effective_workers(workers, backlog, len(backlogs), min_requests)
+    groups = partition_cities(backlogs, workers)
+    allocation_logger.info(
+        f"🗺️ Sharded allocation: {backlog} requests in {len(backlogs)} cities "
+        f"on {workers} worker(s)"
+    )
+
+    if workers > 1:
+        pool = shard_pool(workers)
+        futures = [pool.submit(allocate_cities, cities, as_of, strategy) for cities in groups]
+    else:
+        futures = None
+
+    rows = []
+    for position, cities in enumerate(groups):
+        try:
+            if futures:
+                group_rows = futures[position].result()
+            else:
+                group_rows = allocate_cities(cities, as_of, strategy)
+        except Exception as e:
+            # The global pass below still picks these cities' requests up
+            allocation_logger.error(f"City shards {cities} failed: {e}", exc_info=True)
+            continue
+        rows.extend(group_rows)
+
+    pending_queue.discard([row["request_id"] for row in rows])
+
+    # Cross-city fallback for requests whose own city ran out of capacity
+    leftovers = AllocationService.allocate_pending_requests(db, strategy)
+
+    allocation_logger.info(
+        f"✅ Sharded allocation complete: {len(rows)} in-city, "
+        f"{len(leftovers)} in the global pass"
+    )
+    return [Allocation(**row) for row in rows] + leftovers
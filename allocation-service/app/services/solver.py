@@ -0,0 +1,111 @@
+"""Batch assignment strategies for allocate_pending_requests.
+
+Both strategies take candidates as (request, requester city, priority)
+tuples sorted by priority (highest first) and return
+(request, resource, priority) assignments.
+
+greedy
+    Each request in priority order takes the locally best resource
+    (free capacity + same-city bonus). Under contention an early request
+    can use up capacity in a city whose own requesters come later.
+
+optimal
+    Maximises the batch objective
+
+        sum(priority of assigned requests) + SAME_CITY_BONUS * same-city matches
+
+    subject to resource capacity. As a min-cost flow the graph is
+    request -> {own city pool (cost -(priority + bonus)), any pool
+    (cost -priority)} -> resources. Resource costs depend only on the city,
+    so the flow collapses to one pool per city, and the value a city gets
+    from its own k best requesters is concave in k (the bonus applies to the
+    first `free capacity` of them only). The optimum is therefore the top-K
+    marginal values across all requests, K being the total free capacity:
+    O(N log N) instead of a generic network simplex over N x R edges.
+    Selected requests take a same-city resource (most free capacity first)
+    when they earned the bonus, and any leftover capacity otherwise.
+"""
+from services.capacity import CapacityTracker, SAME_CITY_BONUS
+
+STRATEGIES = ("greedy", "optimal")
+
+
+def greedy_assign(candidates: list[tuple], capacity: CapacityTracker) -> list[tuple]:
+    assignments = []
+    for request, city, priority in candidates:
+        resource, _ = capacity.best_for(city)
+        if resource is None:
+            break  # no free capacity left anywhere
+        capacity.assign(resource.resource_id)
+        assignments.append((request, resource, priority))
+    return assignments
+
+
+def optimal_assign(candidates: list[tuple], capacity: CapacityTracker) -> list[tuple]:
+    free_by_city = capacity.free_by_city()
+    total_free = sum(free_by_city.values())
+
+    # Marginal value of each request; only a city's first `free` requesters
+    # (in priority order) can earn the same-city bonus
+    own_seen: dict[str, int] = {}
+    ranked = []
+    for index, (request, city, priority) in enumerate(candidates):
+        own = False
+        if city and own_seen.get(city, 0) < free_by_city.get(city, 0):
+            own_seen[city] = own_seen.get(city, 0) + 1
+            own = True
+        marginal = priority + SAME_CITY_BONUS if own else priority
+        ranked.append((-marginal, index, own))
+
+    # Ties fall back to priority order, which keeps every city's selection a
+    # prefix of its requesters (so own-city picks never exceed its capacity)
+    ranked.sort()
+    selected = sorted(ranked[:total_free], key=lambda entry: entry[1])
+
+    assignments = []
+    waiting = []
+    for _, index, own in selected:
+        request, city, priority = candidates[index]
+        if not own:
+            waiting.append((request, priority))
+            continue
+        resource = capacity.best_in_city(city)
+        capacity.assign(resource.resource_id)
+        assignments.append((request, resource, priority))
+
+    # Leftover capacity only remains in cities whose bonus-earning
+    # requesters are all served, so these never displace an own-city match
+    for request, priority in waiting:
+        resource, _ = capacity.best_for(None)
+        capacity.assign(resource.resource_id)
+        assignments.append((request, resource, priority))
+
+    assignments.sort(key=lambda assignment: assignment[2], reverse=True)
+    return assignments
+
+
+def assign_batch(
+    candidates: list[tuple], capacity: CapacityTracker, strategy: str = "greedy"
+) -> list[tuple]:
+    if strategy == "optimal":
+        return optimal_assign(candidates, capacity)
+    return greedy_assign(candidates, capacity)
+
+
+def assignment_quality(assignments: list[tuple], cities: dict) -> dict:
+    """Objective breakdown for a set of assignments
+
+    `cities` maps each assigned request to its requester city.
+    """
+    same_city = sum(
+        1
+        for request, resource, _ in assignments
+        if cities.get(request) and resource.city == cities[request]
+    )
+    priority_total = sum(priority for _, _, priority in assignments)
+    return {
+        "assigned": len(assignments),
+        "same_city": same_city,
+        "priority_total": round(priority_total, 2),
+        "objective": round(priority_total + SAME_CITY_BONUS * same_city, 2),
+    }
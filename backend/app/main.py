@@ -1,13 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import engine, Base, SessionLocal
-from models import User, Resource, Request, AllocationRule
+from models import User, Resource, Request, RequestRollup, AllocationRule, RuleSetVersion
 from routers import auth, dashboard, notifications
 from middleware import RequestLoggingMiddleware
 from logging_config import api_logger, database_logger
+from db_pool import pool_status
 import csv
+from collections import Counter
 import os
 from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -46,6 +49,33 @@ def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    """Connection pool occupancy and checkout wait times"""
+    return {"sync": pool_status(engine)}
+
+
+def bump_rule_set_version(db):
+    """Atomically increment the allocation rule-set version (no commit)
+
+    Business-service processes reload their cached rule set when the
+    version moves; see allocation-service services/rule_cache.py.
+    """
+    versions = RuleSetVersion.__table__
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}[db.get_bind().dialect.name]
+    statement = dialect.insert(versions)
+    db.execute(
+        statement.values(id=1, version=1, updated_at=datetime.utcnow())
+        .on_conflict_do_update(
+            index_elements=[versions.c.id],
+            set_={
+                "version": versions.c.version + 1,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
 def load_seed_data():
     """Load initial data from CSV files"""
     db = SessionLocal()
@@ -151,6 +181,7 @@ def load_seed_data():
             with open(requests_file, "r", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
                 requests_count = 0
+                rollups = Counter()
                 for row in reader:
                     req = Request(
                         request_id=row["request_id"],
@@ -164,7 +195,18 @@ def load_seed_data():
                         status="PENDING",
                     )
                     db.add(req)
+                    rollups[(req.urgency, req.service_id)] += 1
                     requests_count += 1
+                # Dashboard counters, maintained by the business service from now on
+                for (urgency, service_id), count in rollups.items():
+                    db.add(
+                        RequestRollup(
+                            status="PENDING",
+                            urgency=urgency,
+                            service_id=service_id,
+                            request_count=count,
+                        )
+                    )
                 database_logger.info(f"Loaded {requests_count} requests")
 
         # Load allocation rules
@@ -182,6 +224,7 @@ def load_seed_data():
                     )
                     db.add(rule)
                     rules_count += 1
+                bump_rule_set_version(db)
                 database_logger.info(f"Loaded {rules_count} allocation rules")
 
         # Load derived variables
@@ -193,23 +236,15 @@ def load_seed_data():
                 reader = csv.DictReader(f)
                 vars_count = 0
                 for row in reader:
-<<<<<<< HEAD
                     var = DerivedVariable(
                         variable_id=row["variable_id"],
                         name=row["name"],
                         formula=row["formula"],
                         description=row.get("description"),
-=======
-                    option = AppOption(
-                        category=row["category"],
-                        key=row["key"],
-                        value=row["value"],
-                        icon=row.get("icon") or None,
-                        order=int(row.get("order", 0)),
->>>>>>> dfbe5a019b945a033813f1830a57ca3ebe1b91a1
                     )
                     db.add(var)
                     vars_count += 1
+                bump_rule_set_version(db)
                 database_logger.info(f"Loaded {vars_count} derived variables")
 
         db.commit()
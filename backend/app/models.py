@@ -1,4 +1,14 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Float,
+    Index,
+    Sequence,
+)
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -64,6 +74,11 @@ class Notification(Base):
 
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        # Per-user notification feed, newest first
+        Index("ix_notifications_user_id_created_at", user_id, created_at.desc()),
+    )
+
 
 class Resource(Base):
     __tablename__ = "resources"
@@ -73,9 +88,14 @@ class Resource(Base):
     capacity = Column(Integer, nullable=False)
     city = Column(String, nullable=False)
     status = Column(String, default="AVAILABLE")  # AVAILABLE, BUSY
+    # ASSIGNED allocations on this resource, kept in step by the allocation
+    # service (services/active_counts.py)
+    active_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     allocations = relationship("Allocation", back_populates="resource")
 
+    __table_args__ = (Index("ix_resources_status", status),)
+
 
 class Request(Base):
     __tablename__ = "requests"
@@ -95,6 +115,13 @@ class Request(Base):
     request_type = relationship("RequestType", back_populates="requests")
     allocation = relationship("Allocation", back_populates="request", uselist=False)
 
+    __table_args__ = (
+        # Pending queue / request lists filtered by status, newest first
+        Index("ix_requests_status_created_at", status, created_at.desc()),
+        # Keyset pagination of request lists (see services/pagination.py)
+        Index("ix_requests_created_at_request_id", created_at.desc(), request_id.desc()),
+    )
+
 
 class Allocation(Base):
     __tablename__ = "allocations"
@@ -109,6 +136,18 @@ class Allocation(Base):
     request = relationship("Request", back_populates="allocation")
     resource = relationship("Resource", back_populates="allocations")
 
+    __table_args__ = (
+        # Capacity checks: ASSIGNED allocations per resource
+        Index("ix_allocations_resource_id_status", resource_id, status),
+        # Allocation lists filtered by status, newest first
+        Index("ix_allocations_status_timestamp", status, timestamp.desc()),
+        Index("ix_allocations_request_id", request_id),
+        # Keyset pagination of allocation lists
+        Index(
+            "ix_allocations_timestamp_allocation_id", timestamp.desc(), allocation_id.desc()
+        ),
+    )
+
 
 class AllocationRule(Base):
     __tablename__ = "allocation_rules"
@@ -119,6 +158,32 @@ class AllocationRule(Base):
     is_active = Column(Boolean, default=True)
 
 
+class RequestRollup(Base):
+    """Request counts per (status, urgency, service_id)
+
+    Maintained incrementally in the transactions that create requests or
+    change their status (allocation service, services/request_rollups.py),
+    so dashboards read a handful of rows instead of scanning requests.
+    """
+
+    __tablename__ = "request_rollups"
+
+    status = Column(String, primary_key=True)
+    urgency = Column(String, primary_key=True)
+    service_id = Column(String, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class RuleSetVersion(Base):
+    """Monotonic allocation rule-set version, bumped on every rule change"""
+
+    __tablename__ = "rule_set_versions"
+
+    id = Column(Integer, primary_key=True)  # Single row (id=1)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class DerivedVariable(Base):
     """Dynamic variables calculated from formulas for rule engine"""
 
@@ -128,3 +193,16 @@ class DerivedVariable(Base):
     name = Column(String, nullable=False)  # e.g. "Risk_Skoru"
     formula = Column(String, nullable=False)  # e.g. "( urgency_score * 2 ) + 10"
     description = Column(String, nullable=True)
+
+
+# Primary key sequences for ID_GENERATOR=sequence (services/ids.py in the
+# allocation service); each nextval() reserves a block of ID_BLOCK_SIZE ids
+ID_BLOCK_SIZE = 1000
+ID_SEQUENCES = {
+    "AL": Sequence(
+        "allocation_id_seq", start=1, increment=ID_BLOCK_SIZE, metadata=Base.metadata
+    ),
+    "REQ": Sequence(
+        "request_id_seq", start=1, increment=ID_BLOCK_SIZE, metadata=Base.metadata
+    ),
+}
@@ -1,59 +1,105 @@
+import os
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, true
 from database import get_db
-from models import Request, Allocation, Resource
+from models import RequestRollup, Resource
 from schemas import DashboardSummary
+from services.ttl_cache import SingleFlightTTLCache
+from services.live_feed import DashboardFeed
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Seconds a computed summary is served before it is recomputed
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "5"))
+
+summary_cache: SingleFlightTTLCache[DashboardSummary] = SingleFlightTTLCache(
+    DASHBOARD_CACHE_TTL_SECONDS
+)
 
-@router.get("/summary", response_model=DashboardSummary)
-def get_dashboard_summary(db: Session = Depends(get_db)):
-    """Get dashboard summary statistics"""
 
-    # Pending requests count
-    pending_requests = db.query(Request).filter(Request.status == "PENDING").count()
+def summary_statement():
+    """Resource totals and pending counts per (urgency, service) in one query
 
-    # Active allocations count
-    active_allocations = (
-        db.query(Allocation).filter(Allocation.status == "ASSIGNED").count()
+    One row per pending (urgency, service_id) group, each carrying the
+    resource totals; a single row with NULL groups when nothing is pending.
+    Pending counts come from the incrementally maintained request_rollups
+    table and active allocations from Resource.active_count, so neither
+    requests nor allocations are scanned.
+    """
+    totals = select(
+        func.count(Resource.resource_id).label("total_resources"),
+        func.coalesce(func.sum(Resource.capacity), 0).label("total_capacity"),
+        func.coalesce(func.sum(Resource.active_count), 0).label("active_allocations"),
+    ).cte("totals")
+    pending = (
+        select(
+            RequestRollup.urgency,
+            RequestRollup.service_id,
+            RequestRollup.request_count.label("pending"),
+        )
+        .where(RequestRollup.status == "PENDING", RequestRollup.request_count > 0)
+        .cte("pending")
     )
+    return select(
+        totals, pending.c.urgency, pending.c.service_id, pending.c.pending
+    ).select_from(totals.outerjoin(pending, true()))
+
+
+def compute_summary(db: Session) -> DashboardSummary:
+    rows = db.execute(summary_statement()).all()
+    totals = rows[0]
 
-    # Total resources
-    total_resources = db.query(Resource).count()
+    requests_by_urgency: dict[str, int] = {}
+    requests_by_service: dict[str, int] = {}
+    for row in rows:
+        if row.pending is None:
+            continue
+        requests_by_urgency[row.urgency] = requests_by_urgency.get(row.urgency, 0) + row.pending
+        requests_by_service[row.service_id] = (
+            requests_by_service.get(row.service_id, 0) + row.pending
+        )
 
     # Resource utilization
-    total_capacity = db.query(func.sum(Resource.capacity)).scalar() or 0
     utilization = (
-        (active_allocations / total_capacity * 100) if total_capacity > 0 else 0
+        (totals.active_allocations / totals.total_capacity * 100)
+        if totals.total_capacity > 0
+        else 0
     )
 
-    # Requests by urgency
-    urgency_counts = (
-        db.query(Request.urgency, func.count(Request.request_id))
-        .filter(Request.status == "PENDING")
-        .group_by(Request.urgency)
-        .all()
+    return DashboardSummary(
+        pending_requests=sum(requests_by_urgency.values()),
+        active_allocations=totals.active_allocations,
+        total_resources=totals.total_resources,
+        resource_utilization=round(utilization, 2),
+        requests_by_urgency=requests_by_urgency,
+        requests_by_service=requests_by_service,
     )
 
-    requests_by_urgency = {u: c for u, c in urgency_counts}
 
-    # Requests by service
-    service_counts = (
-        db.query(Request.service, func.count(Request.request_id))
-        .filter(Request.status == "PENDING")
-        .group_by(Request.service)
-        .all()
-    )
+@router.get("/summary", response_model=DashboardSummary)
+def get_dashboard_summary(db: Session = Depends(get_db)):
+    """Get dashboard summary statistics
 
-    requests_by_service = {s: c for s, c in service_counts}
+    Computed in one query and cached for DASHBOARD_CACHE_TTL_SECONDS;
+    concurrent requests share a single refresh.
+    """
+    return summary_cache.get(lambda: compute_summary(db))
 
-    return DashboardSummary(
-        pending_requests=pending_requests,
-        active_allocations=active_allocations,
-        total_resources=total_resources,
-        resource_utilization=round(utilization, 2),
-        requests_by_urgency=requests_by_urgency,
-        requests_by_service=requests_by_service,
+
+dashboard_feed = DashboardFeed(compute_summary)
+
+
+@router.get("/stream")
+async def stream_dashboard():
+    """Live summary deltas and new allocations as Server-Sent Events
+
+    Events: `summary` (full on connect, then changed fields only) and
+    `allocations` (new allocations, oldest first).
+    """
+    return StreamingResponse(
+        dashboard_feed.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -43,7 +43,7 @@ class RequestResponse(BaseModel):
     service_id: str
     request_type_id: str
     urgency: str
-    created_at: datetime
+    created_at: Optional[datetime] = None
     status: str
 
     class Config:
@@ -57,7 +57,7 @@ class AllocationResponse(BaseModel):
     resource_id: str
     priority_score: float
     status: str
-    timestamp: datetime
+    timestamp: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,252 @@
+"""Live dashboard feed served as Server-Sent Events.
+
+While at least one client is connected, a single background task reads
+the dashboard summary (one query over request_rollups and resources) and
+the newest allocations, and fans the changes out to every subscriber. Any
+number of open dashboards therefore cost one pair of small queries per
+refresh, instead of each page refetching full lists.
+
+On PostgreSQL the task LISTENs on DASHBOARD_CHANNEL. The allocation
+service NOTIFYs it in every transaction that creates, allocates or
+releases requests (services/dashboard_notify.py there), so the feed
+refreshes only after such a commit, and at most once per
+FEED_MIN_INTERVAL. A full refresh still runs every
+DASHBOARD_STREAM_RESYNC_SECONDS, for changes that send no notification
+(resource edits, manual SQL) and for a lost listener connection. Other
+databases are polled every DASHBOARD_STREAM_POLL_SECONDS.
+
+Events:
+    summary      full summary on connect, then only the fields that changed
+    allocations  allocations created since the previous poll, oldest first
+
+Allocation timestamps are set before their transaction commits, so the
+feed re-reads a short look-back window and skips allocations it has
+already sent. At most FEED_ALLOCATIONS_LIMIT allocations are sent per
+refresh (the newest); counts stay exact through the summary. A client too
+slow to keep up is resynced with the full summary and the allocations it
+missed.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine
+from models import Allocation
+from schemas import AllocationResponse
+from logging_config import api_logger
+
+DASHBOARD_STREAM_POLL_SECONDS = float(os.getenv("DASHBOARD_STREAM_POLL_SECONDS", "1"))
+DASHBOARD_STREAM_RESYNC_SECONDS = float(os.getenv("DASHBOARD_STREAM_RESYNC_SECONDS", "30"))
+# Must match DASHBOARD_CHANNEL in the allocation service
+DASHBOARD_CHANNEL = "dashboard_feed"
+# Comment line sent when idle, so proxies keep the connection open
+DASHBOARD_STREAM_HEARTBEAT_SECONDS = 15
+
+FEED_LOOKBACK = timedelta(seconds=30)
+FEED_MIN_INTERVAL = 0.25
+FEED_ALLOCATIONS_LIMIT = 100
+# Events buffered per client; a client that falls further behind is resynced
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class DashboardFeed:
+    def __init__(self, load_summary: Callable[[Session], BaseModel]):
+        self.load_summary = load_summary
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+        self._listener = None
+        self._listener_fd: int | None = None  # fileno() fails once the socket closes
+        self._wake: asyncio.Event | None = None
+        self._reset()
+
+    def _reset(self):
+        self._summary: dict | None = None
+        self._high_water: datetime | None = None
+        self._sent: dict[str, datetime] = {}  # allocation_id -> timestamp
+
+    def _poll(self) -> tuple[dict, list[dict]]:
+        """(summary, new allocations); runs in the threadpool"""
+        db = SessionLocal()
+        try:
+            summary = self.load_summary(db).model_dump(mode="json")
+
+            query = (
+                select(Allocation)
+                .where(Allocation.timestamp.isnot(None))
+                .order_by(Allocation.timestamp.desc(), Allocation.allocation_id.desc())
+            )
+            if self._high_water is not None:
+                query = query.where(Allocation.timestamp >= self._high_water - FEED_LOOKBACK)
+            rows = db.scalars(query.limit(FEED_ALLOCATIONS_LIMIT)).all()
+        finally:
+            db.close()
+
+        first_poll = self._high_water is None
+        fresh = [row for row in reversed(rows) if row.allocation_id not in self._sent]
+        for row in fresh:
+            self._sent[row.allocation_id] = row.timestamp
+        if rows:
+            self._high_water = max(self._high_water or rows[0].timestamp, rows[0].timestamp)
+        elif first_poll:
+            self._high_water = datetime.min + FEED_LOOKBACK
+        floor = self._high_water - FEED_LOOKBACK
+        self._sent = {key: stamp for key, stamp in self._sent.items() if stamp >= floor}
+
+        if first_poll:
+            # Clients render the existing allocations themselves
+            return summary, []
+        return summary, [
+            AllocationResponse.model_validate(row).model_dump(mode="json") for row in fresh
+        ]
+
+    def _listen(self):
+        """psycopg2 connection LISTENing on DASHBOARD_CHANNEL, or None"""
+        if engine.dialect.name != "postgresql":
+            return None
+        pooled = engine.raw_connection()
+        connection = pooled.driver_connection
+        pooled.detach()  # Held for the feed's lifetime, outside the pool
+        try:
+            connection.rollback()  # Pre-ping may have opened a transaction
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {DASHBOARD_CHANNEL}")
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    async def _start_listening(self):
+        try:
+            self._listener = await run_in_threadpool(self._listen)
+        except Exception as e:
+            api_logger.warning(f"Dashboard feed cannot LISTEN, polling instead: {e}")
+            return
+        if self._listener is not None:
+            self._listener_fd = self._listener.fileno()
+            asyncio.get_running_loop().add_reader(self._listener_fd, self._on_notify)
+
+    def _stop_listening(self):
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        try:
+            asyncio.get_running_loop().remove_reader(self._listener_fd)
+        finally:
+            listener.close()
+
+    def _on_notify(self):
+        """Reader callback: consume pending notifications and wake the feed"""
+        try:
+            self._listener.poll()
+        except Exception as e:
+            api_logger.warning(f"Dashboard feed lost its LISTEN connection: {e}")
+            self._stop_listening()
+        else:
+            self._listener.notifies.clear()
+        self._wake.set()
+
+    def _publish(self, summary: dict, allocations: list[dict]):
+        events = []
+        if self._summary is None:
+            events.append(("summary", summary))
+        else:
+            delta = {
+                key: value for key, value in summary.items() if self._summary.get(key) != value
+            }
+            if delta:
+                events.append(("summary", delta))
+        self._summary = summary
+        if allocations:
+            events.append(("allocations", allocations))
+
+        for queue in self._subscribers:
+            if queue.qsize() + len(events) > queue.maxsize:
+                self._resync(queue, summary, allocations)
+            else:
+                for event in events:
+                    queue.put_nowait(event)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue, summary: dict, allocations: list[dict]):
+        """Swap a slow client's backlog for the full summary and missed allocations"""
+        missed = []
+        while not queue.empty():
+            event, data = queue.get_nowait()
+            if event == "allocations":
+                missed.extend(data)
+        missed.extend(allocations)
+        queue.put_nowait(("summary", summary))
+        if missed:
+            queue.put_nowait(("allocations", missed[-FEED_ALLOCATIONS_LIMIT:]))
+
+    async def _run(self):
+        api_logger.info("📡 Dashboard feed started")
+        try:
+            while self._subscribers:
+                if self._listener is None:
+                    # First start, or reconnect after losing the listener
+                    await self._start_listening()
+                self._wake.clear()
+                try:
+                    summary, allocations = await run_in_threadpool(self._poll)
+                    self._publish(summary, allocations)
+                except Exception as e:
+                    api_logger.error(f"Dashboard feed poll failed: {e}", exc_info=True)
+
+                if self._listener is None:
+                    await asyncio.sleep(DASHBOARD_STREAM_POLL_SECONDS)
+                    continue
+                # Commits within the interval share the next refresh
+                await asyncio.sleep(FEED_MIN_INTERVAL)
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), DASHBOARD_STREAM_RESYNC_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._stop_listening()
+            self._reset()
+            api_logger.info("📡 Dashboard feed stopped (no subscribers)")
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self._summary is not None:
+            queue.put_nowait(("summary", self._summary))
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._wake is not None:
+            self._wake.set()  # Let the feed task stop now
+
+    async def events(self) -> AsyncIterator[str]:
+        """SSE stream for one client; ends when the client disconnects"""
+        queue = self.subscribe()
+        try:
+            yield f"retry: {int(DASHBOARD_STREAM_POLL_SECONDS * 1000) + 2000}\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        queue.get(), DASHBOARD_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(event, data)
+        finally:
+            self.unsubscribe(queue)
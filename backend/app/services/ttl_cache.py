@@ -0,0 +1,51 @@
+"""In-process TTL cache with single-flight refresh.
+
+When the cached value has expired, the first caller recomputes it while
+concurrent callers wait for that result instead of running their own
+query, so a burst of N clients costs one database round trip per TTL.
+"""
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightTTLCache(Generic[T]):
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._value: T | None = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self) -> T | None:
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._value
+        return None
+
+    def get(self, loader: Callable[[], T]) -> T:
+        """Cached value, or loader() run by exactly one caller at a time"""
+        value = self._fresh()
+        if value is not None:
+            return value
+
+        with self._refresh_lock:
+            # Another caller may have refreshed it while we waited
+            value = self._fresh()
+            if value is not None:
+                return value
+            value = loader()
+            with self._lock:
+                self._value = value
+                self._expires_at = time.monotonic() + self.ttl_seconds
+                self.misses += 1
+            return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value, self._expires_at = None, 0.0
@@ -0,0 +1,86 @@
+"""Benchmark: per-call requests.get vs the pooled HttpClient
+
+Fires `--requests` GETs at a running backend from `--concurrency` threads,
+as concurrent dashboard page loads do. The first mode calls requests.get
+directly, which opens a new TCP connection every time. The second goes
+through http_client.HttpClient, whose threads share keep-alive
+connections. Reports throughput, latency percentiles and the client's
+connection reuse stats. Needs a reachable service; the default target is
+BUSINESS_SERVICE_URL + /resources.
+
+Usage (from the frontend root, e.g. /app inside the container):
+    python -m benchmarks.bench_http_pool [--url http://business-service:8001]
+        [--path /resources] [--requests 2000] [--concurrency 20]
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from http_client import CONNECT_TIMEOUT, READ_TIMEOUT, HttpClient
+
+
+def run(fetch, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+
+    def one(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = fetch().ok
+        except requests.RequestException:
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=os.getenv("BUSINESS_SERVICE_URL", "http://localhost:8001")
+    )
+    parser.add_argument("--path", default="/resources")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    client = HttpClient(args.url, "bench")
+    modes = {
+        "per-call": lambda: requests.get(
+            f"{args.url}{args.path}", timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+        ),
+        "pooled": lambda: client.get(args.path),
+    }
+
+    print(f"{args.url}{args.path} requests={args.requests} concurrency={args.concurrency}")
+    for name, fetch in modes.items():
+        result = run(fetch, args.requests, args.concurrency)
+        print(
+            f"  {name:<8}: {result['rps']:8.0f} req/s  p50={result['p50']:7.1f}ms  "
+            f"p99={result['p99']:7.1f}ms  errors={result['errors']}"
+        )
+
+    stats = client.stats()
+    print(
+        f"  pooled connections: opened={stats['connections_opened']} "
+        f"reused={stats['connections_reused']} reuse_ratio={stats['reuse_ratio']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
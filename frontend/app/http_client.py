@@ -0,0 +1,135 @@
+"""Pooled HTTP clients for calls to the backend services.
+
+One HttpClient per upstream service keeps a bounded pool of keep-alive
+connections that all request threads share. Settings come from the
+environment:
+
+    HTTP_POOL_MAXSIZE      idle connections kept per upstream (10)
+    HTTP_CONNECT_TIMEOUT   seconds to establish a connection (3.05)
+    HTTP_READ_TIMEOUT      seconds to wait for response data (10)
+    HTTP_RETRIES           retries on connection errors, and on 502/503/504
+                           for idempotent methods only (2)
+
+The pool does not block: when every kept connection is busy, an extra one
+is opened and closed afterwards (urllib3 logs "Connection pool is full").
+Long-lived streams therefore never starve ordinary page requests.
+
+requests.Session is not thread-safe, so each thread gets its own Session.
+All of them mount the client's single HTTPAdapter, whose urllib3 pool is
+thread-safe. The Sessions store no cookies, so one user's response cannot
+leak into another user's request.
+
+HttpClient.stats() reports requests, latency and connections opened.
+Requests minus connections opened is the number of calls that reused a
+pooled connection.
+"""
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+
+
+class HttpClient:
+    """Thread-safe pooled client for one upstream base URL"""
+
+    def __init__(self, base_url: str, name: str):
+        self.base_url = base_url.rstrip("/")
+        self.name = name
+        self._adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(
+                total=RETRIES,
+                backoff_factor=0.2,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                raise_on_status=False,
+            ),
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._retries = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send a request to base_url + endpoint; raises requests exceptions"""
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+        start = time.perf_counter()
+        failed = True
+        retries = 0
+        try:
+            response = self._session().request(
+                method, f"{self.base_url}{endpoint}", **kwargs
+            )
+            retry_state = getattr(response.raw, "retries", None)
+            retries = len(retry_state.history) if retry_state else 0
+            failed = False
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._requests += 1
+                self._errors += failed
+                self._retries += retries
+                self._latency_total += elapsed
+                self._latency_max = max(self._latency_max, elapsed)
+
+    def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("POST", endpoint, **kwargs)
+
+    def stats(self) -> dict:
+        """Request counts, latency and connection reuse"""
+        opened = sent = 0
+        manager = self._adapter.poolmanager
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+
+        with self._lock:
+            requests_total = self._requests
+            return {
+                "base_url": self.base_url,
+                "pool_maxsize": POOL_MAXSIZE,
+                "requests": requests_total,
+                "errors": self._errors,
+                "retries": self._retries,
+                "latency_avg_ms": (
+                    round(self._latency_total / requests_total * 1000, 3)
+                    if requests_total
+                    else 0.0
+                ),
+                "latency_max_ms": round(self._latency_max * 1000, 3),
+                "connections_opened": opened,
+                "connections_reused": max(sent - opened, 0),
+                "reuse_ratio": round(1 - opened / sent, 3) if sent else 0.0,
+            }
+
+    def close(self):
+        self._adapter.close()
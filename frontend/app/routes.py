@@ -1,7 +1,20 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+    session,
+    stream_with_context,
+)
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import requests
 import os
+from http_client import CONNECT_TIMEOUT, HttpClient
 from logging_config import dashboard_logger
 
 app = Flask(__name__)
@@ -12,6 +25,16 @@ app.secret_key = os.getenv(
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 BUSINESS_API_URL = os.getenv("BUSINESS_SERVICE_URL", "http://localhost:8001")
 
+# Shared keep-alive connection pools (see http_client.py)
+api_client = HttpClient(API_URL, "api")
+business_client = HttpClient(BUSINESS_API_URL, "business")
+
+# Threads that run the backend calls of one page load concurrently
+FANOUT_WORKERS = int(os.getenv("FRONTEND_FANOUT_WORKERS", "8"))
+fanout_executor = ThreadPoolExecutor(
+    max_workers=FANOUT_WORKERS, thread_name_prefix="fanout"
+)
+
 dashboard_logger.info(f"🚀 Flask Dashboard starting... API_URL={API_URL}")
 
 
@@ -26,12 +49,13 @@ def get_auth_header():
     return {}
 
 
-def api_get(endpoint, auth=False):
+def api_get(endpoint, auth=False, client=None):
     """Make GET request to API"""
+    client = client or api_client
     try:
         headers = get_auth_header() if auth else {}
-        dashboard_logger.debug(f"GET {API_URL}{endpoint}")
-        response = requests.get(f"{API_URL}{endpoint}", headers=headers)
+        dashboard_logger.debug(f"GET {client.base_url}{endpoint}")
+        response = client.get(endpoint, headers=headers)
         if response.ok:
             return response.json()
         dashboard_logger.warning(
@@ -43,18 +67,17 @@ def api_get(endpoint, auth=False):
         return []
 
 
-def api_post(endpoint, data=None, auth=False, form_data=False):
+def api_post(endpoint, data=None, auth=False, form_data=False, client=None):
     """Make POST request to API"""
+    client = client or api_client
     try:
         headers = get_auth_header() if auth else {}
-        dashboard_logger.debug(f"POST {API_URL}{endpoint}")
+        dashboard_logger.debug(f"POST {client.base_url}{endpoint}")
 
         if form_data:
-            response = requests.post(f"{API_URL}{endpoint}", data=data, headers=headers)
+            response = client.post(endpoint, data=data, headers=headers)
         else:
-            response = requests.post(
-                f"{API_URL}{endpoint}", json=data or {}, headers=headers
-            )
+            response = client.post(endpoint, json=data or {}, headers=headers)
 
         if response.ok:
             dashboard_logger.info(f"API POST success: {endpoint}")
@@ -68,6 +91,60 @@ def api_post(endpoint, data=None, auth=False, form_data=False):
         return None
 
 
+def api_get_many(calls, auth=False):
+    """GET several (client, endpoint) pairs concurrently
+
+    Returns the decoded bodies in order, None for a failed call, so the
+    page waits for the slowest call instead of the sum of all of them.
+    """
+    # Session is request-bound; resolve the header before leaving this thread
+    headers = get_auth_header() if auth else {}
+
+    def fetch(client, endpoint):
+        try:
+            response = client.get(endpoint, headers=headers)
+            if response.ok:
+                return response.json()
+            dashboard_logger.warning(
+                f"API GET failed: {endpoint} -> {response.status_code}"
+            )
+        except Exception as e:
+            dashboard_logger.error(f"API GET error: {endpoint} -> {e}")
+        return None
+
+    futures = [
+        fanout_executor.submit(fetch, client, endpoint) for client, endpoint in calls
+    ]
+    return [future.result() for future in futures]
+
+
+def business_api_get(endpoint, auth=False):
+    """Make GET request to the business service"""
+    return api_get(endpoint, auth=auth, client=business_client)
+
+
+def business_api_post(endpoint, data=None, auth=False):
+    """Make POST request to the business service"""
+    return api_post(endpoint, data, auth=auth, client=business_client)
+
+
+def business_api_get_page(endpoint, params=None, auth=False):
+    """GET one page of a list endpoint: (items, cursor of the next page or None)"""
+    try:
+        headers = get_auth_header() if auth else {}
+        dashboard_logger.debug(f"GET {business_client.base_url}{endpoint} {params}")
+        response = business_client.get(endpoint, params=params, headers=headers)
+        if response.ok:
+            return response.json(), response.headers.get("X-Next-Cursor")
+        dashboard_logger.warning(
+            f"API GET failed: {endpoint} -> {response.status_code}"
+        )
+        return [], None
+    except Exception as e:
+        dashboard_logger.error(f"API GET error: {endpoint} -> {e}")
+        return [], None
+
+
 # ============ Decorators ============
 
 
@@ -237,33 +314,38 @@ def user_requests():
 def admin_dashboard():
     """Admin dashboard"""
     try:
-        # Fetch data from business service
-        headers = get_auth_header()
-
-        # Get all requests
-        requests_resp = requests.get(f"{BUSINESS_URL}/requests", headers=headers)
-        all_requests = requests_resp.json() if requests_resp.ok else []
-
-        # Get all allocations
-        allocations_resp = requests.get(f"{BUSINESS_URL}/allocations", headers=headers)
-        all_allocations = allocations_resp.json() if allocations_resp.ok else []
-
-        # Get all resources
-        resources_resp = requests.get(f"{BUSINESS_URL}/resources", headers=headers)
-        all_resources = resources_resp.json() if resources_resp.ok else []
-
-        # Calculate stats
-        pending_count = sum(1 for r in all_requests if r.get("status") == "PENDING")
-        active_allocations = sum(
-            1 for a in all_allocations if a.get("status") == "ASSIGNED"
+        # Aggregate counts from the backend summary; lists from the business
+        # service (latest allocations only, resources for the status panel)
+        summary, recent_allocations, all_resources = api_get_many(
+            [
+                (api_client, "/dashboard/summary"),
+                (business_client, "/allocations?limit=10"),
+                (business_client, "/resources"),
+            ],
+            auth=True,
         )
+        recent_allocations = recent_allocations or []
+        all_resources = all_resources or []
+
+        for res in all_resources:
+            res["active_allocations"] = res.get("active_count", 0)
         available_resources = sum(
             1 for r in all_resources if r.get("status") == "AVAILABLE"
         )
-        total_resources = len(all_resources)
-        utilization = (
-            (active_allocations / total_resources * 100) if total_resources > 0 else 0
-        )
+
+        if summary:
+            pending_count = summary["pending_requests"]
+            active_allocations = summary["active_allocations"]
+            utilization = summary["resource_utilization"]
+        else:
+            # Summary unavailable: derive the counts from the business service
+            queue_stats = business_api_get("/allocations/queue", auth=True) or {}
+            pending_count = queue_stats.get("pending", 0)
+            active_allocations = sum(r["active_allocations"] for r in all_resources)
+            total_capacity = sum(r.get("capacity", 0) for r in all_resources)
+            utilization = (
+                (active_allocations / total_capacity * 100) if total_capacity > 0 else 0
+            )
 
         dashboard_logger.info(
             f"Admin dashboard: {pending_count} pending, {active_allocations} active"
@@ -275,7 +357,7 @@ def admin_dashboard():
             active_allocations=active_allocations,
             available_resources=available_resources,
             utilization=round(utilization, 1),
-            recent_allocations=all_allocations[:10],  # Last 10
+            recent_allocations=recent_allocations,
             resources=all_resources,
         )
     except Exception as e:
@@ -291,25 +373,58 @@ def admin_dashboard():
         )
 
 
+@app.route("/admin/dashboard/stream")
+@login_required
+@admin_required
+def admin_dashboard_stream():
+    """Relay the backend's live dashboard feed (Server-Sent Events)"""
+    try:
+        upstream = api_client.get(
+            "/dashboard/stream",
+            headers=get_auth_header(),
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, None),
+        )
+        upstream.raise_for_status()
+    except requests.RequestException as e:
+        dashboard_logger.error(f"Dashboard stream unavailable: {e}")
+        return Response("Dashboard stream unavailable", status=503)
+
+    def relay():
+        try:
+            for chunk in upstream.iter_content(chunk_size=None):
+                yield chunk
+        finally:
+            upstream.close()
+
+    return Response(
+        stream_with_context(relay()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/admin/requests")
 @login_required
 @admin_required
 def admin_requests():
     """View all requests"""
-    status = request.args.get("status", "")
-    urgency = request.args.get("urgency", "")
-
-    endpoint = "/requests"
-    params = []
-    if status:
-        params.append(f"status={status}")
-    if urgency:
-        params.append(f"urgency={urgency}")
-    if params:
-        endpoint += "?" + "&".join(params)
+    filters = {
+        key: request.args[key]
+        for key in ("status", "urgency")
+        if request.args.get(key)
+    }
+    params = dict(filters, cursor=request.args.get("cursor") or None)
 
-    requests_list = business_api_get(endpoint, auth=True)
-    return render_template("admin/requests.html", requests=requests_list)
+    requests_list, next_cursor = business_api_get_page(
+        "/requests", params=params, auth=True
+    )
+    return render_template(
+        "admin/requests.html",
+        requests=requests_list,
+        filters=filters,
+        next_cursor=next_cursor,
+    )
 
 
 @app.route("/admin/resources")
@@ -317,12 +432,9 @@ def admin_requests():
 def admin_resources():
     """View and manage resources"""
     resources_list = business_api_get("/resources", auth=True)
-    allocations = business_api_get("/allocations?status=ASSIGNED", auth=True)
 
     for res in resources_list:
-        active = sum(
-            1 for a in allocations if a.get("resource_id") == res["resource_id"]
-        )
+        active = res.get("active_count", 0)
         res["active_allocations"] = active
         res["utilization"] = (
             (active / res["capacity"] * 100) if res["capacity"] > 0 else 0
@@ -335,8 +447,12 @@ def admin_resources():
 @admin_required
 def admin_allocations():
     """View all allocations"""
-    allocations_list = business_api_get("/allocations", auth=True)
-    return render_template("admin/allocations.html", allocations=allocations_list)
+    allocations_list, next_cursor = business_api_get_page(
+        "/allocations", params={"cursor": request.args.get("cursor") or None}, auth=True
+    )
+    return render_template(
+        "admin/allocations.html", allocations=allocations_list, next_cursor=next_cursor
+    )
 
 
 @app.route("/admin/allocate", methods=["POST"])
@@ -362,7 +478,7 @@ def admin_rules():
     variables = []
     try:
         headers = get_auth_header()
-        resp = requests.get(f"{BUSINESS_URL}/derived-variables", headers=headers)
+        resp = business_client.get("/derived-variables", headers=headers)
         if resp.ok:
             variables = resp.json()
     except:
@@ -371,6 +487,12 @@ def admin_rules():
     return render_template("admin/rules.html", rules=rules, variables=variables)
 
 
+@app.route("/metrics/http-pool")
+def http_pool_metrics():
+    """Backend call counts, latency and keep-alive connection reuse"""
+    return jsonify({"api": api_client.stats(), "business": business_client.stats()})
+
+
 # ============ Context Processor ============
 
 